@@ -1,497 +1,913 @@
-import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-
-# print("Libraries imported!")
-
-# Load data
-df = pd.read_csv('global_house_purchase_dataset.csv')
-# print(f"Data loaded! Shape: {df.shape}")
-
-# Initialize app
-app = dash.Dash(__name__)
-server = app.server 
-
-# Styles
-SIDEBAR_STYLE = {
-    "position": "fixed",
-    "top": 0,
-    "left": 0,
-    "bottom": 0,
-    "width": "250px",
-    "padding": "35px 25px",
-    "background": "linear-gradient(180deg, #1e3c72 0%, #2a5298 100%)",
-    "boxShadow": "4px 0 15px rgba(0,0,0,0.15)",
-    "zIndex": "1000"
-}
-
-CONTENT_STYLE = {
-    "marginLeft": "270px",
-    "marginRight": "20px",
-    "padding": "40px",
-    "backgroundColor": "#f5f6fa",
-    "minHeight": "100vh"
-}
-
-# Define chart components
-chart1_dashboard = dcc.Graph(id='chart1-dashboard', config={'displayModeBar': False})
-chart2_dashboard = dcc.Graph(id='chart2-dashboard', config={'displayModeBar': False})
-chart3_dashboard = dcc.Graph(id='chart3-dashboard', config={'displayModeBar': False})
-chart4_dashboard = dcc.Graph(id='chart4-dashboard', config={'displayModeBar': False})
-chart5_dashboard = dcc.Graph(id='chart5-dashboard', config={'displayModeBar': False})
-
-metric_dropdown_dashboard = dcc.Dropdown(
-    id='metric-dropdown-dashboard',
-    options=[
-        {'label': 'Loan Amount', 'value': 'loan_amount'},
-        {'label': 'Down Payment', 'value': 'down_payment'}
-    ],
-    value='loan_amount',
-    style={'marginBottom': '20px', 'fontSize': '14px'}
-)
-
-# Country-wise components
-country_dropdown_main = dcc.Dropdown(
-    id='country-dropdown-main',
-    options=[{'label': c, 'value': c} for c in sorted(df['country'].unique())],
-    value='USA',
-    placeholder='Select a country...',
-    style={'width': '300px', 'fontSize': '14px'}
-)
-
-city_dropdown_country = dcc.Dropdown(id='city-dropdown-country', options=[], placeholder='Select a city...', style={'marginBottom': '20px', 'fontSize': '14px'})
-furnishing_dropdown_country = dcc.Dropdown(id='furnishing-dropdown-country', options=[], placeholder='Select furnishing...', style={'marginBottom': '20px', 'fontSize': '14px'})
-financial_metric_dropdown_country = dcc.Dropdown(
-    id='financial-metric-dropdown-country',
-    options=[
-        {'label': 'Avg Salary', 'value': 'customer_salary'},
-        {'label': 'Avg Down Payment', 'value': 'down_payment'},
-        {'label': 'Avg Loan Amount', 'value': 'loan_amount'}
-    ],
-    value='customer_salary',
-    style={'marginBottom': '20px', 'fontSize': '14px'}
-)
-rooms_dropdown_country = dcc.Dropdown(id='rooms-dropdown-country', options=[], placeholder='Select rooms...', style={'marginBottom': '20px', 'fontSize': '14px'})
-connectivity_dropdown_country = dcc.Dropdown(id='connectivity-dropdown-country', options=[], placeholder='Select connectivity...', style={'marginBottom': '20px', 'fontSize': '14px'})
-
-chart1_country = dcc.Graph(id='chart1-country', config={'displayModeBar': False})
-chart2_country = dcc.Graph(id='chart2-country', config={'displayModeBar': False})
-chart3_country = dcc.Graph(id='chart3-country', config={'displayModeBar': False})
-chart4_country = dcc.Graph(id='chart4-country', config={'displayModeBar': False})
-chart5_country = dcc.Graph(id='chart5-country', config={'displayModeBar': False})
-
-# Sidebar
-sidebar = html.Div([
-    html.Div([
-        html.H2("Global House Purchase Dashboard", style={"color": "#fff", "fontSize": "30px", "fontWeight": "800", "marginBottom": "5px", "letterSpacing": "0.5px"}),
-        html.P("Analytics Dashboard", style={"color": "rgba(255,255,255,0.75)", "fontSize": "14px", "marginBottom": "50px", "fontWeight": "300"})
-    ]),
-    
-    dcc.Link(
-    html.Div([
-        html.Div("📊", style={"fontSize": "18px", "marginBottom": "4px"}),  # smaller icon
-        html.Div("Dashboard", style={"fontSize": "14px", "fontWeight": "600"})  # smaller text
-    ], style={"textAlign": "center"}),
-    href="/",
-    style={
-        "display": "block",
-        "padding": "8px 12px",   # reduced padding
-        "color": "#fff",
-        "textDecoration": "none",
-        "borderRadius": "8px",   # smaller radius
-        "marginBottom": "8px",   # less spacing below
-        "background": "rgba(255,255,255,0.15)",
-        "transition": "all 0.3s ease",
-        "border": "1px solid rgba(255,255,255,0.2)"  # thinner border
-    }
-),
-    
-    dcc.Link(
-        html.Div([
-            html.Div("🌍", style={"fontSize": "18px", "marginBottom": "4px"}),
-            html.Div("Country Analysis", style={"fontSize": "14px", "fontWeight": "600"})
-        ], style={"textAlign": "center"}),
-        href="/country-wise",
-        style={
-            "display": "block",
-        "padding": "8px 12px",   # reduced padding
-        "color": "#fff",
-        "textDecoration": "none",
-        "borderRadius": "8px",   # smaller radius
-        "marginBottom": "8px",   # less spacing below
-        "background": "rgba(255,255,255,0.15)",
-        "transition": "all 0.3s ease",
-        "border": "1px solid rgba(255,255,255,0.2)"  # thinner border
-        }
-    )
-], style=SIDEBAR_STYLE)
-
-# Dashboard Layout
-dashboard_layout = html.Div([
-    html.Div([
-        html.H1("Global Comparision", 
-                style={'color': '#1e3c72', 'fontSize': '38px', 'fontWeight': '800', 'marginBottom': '10px', 'letterSpacing': '-0.5px'}),
-        html.P("Comprehensive market overview and insights", 
-               style={'color': '#6c757d', 'fontSize': '15px', 'marginBottom': '0'})
-    ], style={'marginBottom': '40px'}),
-    
-    # Top Chart
-    html.Div([
-        html.Div([
-            html.H3("Country-wise Average Per Sqft Value", 
-                    style={'color': '#2c3e50', 'marginBottom': '20px', 'fontSize': '20px', 'fontWeight': '700'}),
-            chart1_dashboard
-        ], style={
-            'background': '#fff',
-            'padding': '30px',
-            'borderRadius': '15px',
-            'boxShadow': '0 4px 15px rgba(0,0,0,0.08)',
-            'border': '1px solid #e3e6eb'
-        })
-    ], style={'marginBottom': '30px'}),
-
-    # 2x2 Grid
-    html.Div([
-        html.Div([
-            html.Div([
-                html.H3("Property Type Distribution", 
-                        style={'color': '#2c3e50', 'marginBottom': '20px', 'fontSize': '18px', 'fontWeight': '700'}),
-                chart2_dashboard
-            ], style={
-                'background': '#fff',
-                'padding': '30px',
-                'borderRadius': '15px',
-                'boxShadow': '0 4px 15px rgba(0,0,0,0.08)',
-                'border': '1px solid #e3e6eb',
-                'height': '550px'
-            })
-        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top'}),
-
-        html.Div([
-            html.Div([
-                html.H3("Financial Comparison", 
-                        style={'color': '#2c3e50', 'marginBottom': '15px', 'fontSize': '18px', 'fontWeight': '700'}),
-                metric_dropdown_dashboard,
-                chart3_dashboard
-            ], style={
-                'background': '#fff',
-                'padding': '30px',
-                'borderRadius': '15px',
-                'boxShadow': '0 4px 15px rgba(0,0,0,0.08)',
-                'border': '1px solid #e3e6eb',
-                'height': '550px'
-            })
-        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top', 'marginLeft': '2%'}),
-    ], style={'marginBottom': '30px'}),
-
-    html.Div([
-        html.Div([
-            html.Div([
-                html.H3("Salary Distribution", 
-                        style={'color': '#2c3e50', 'marginBottom': '20px', 'fontSize': '18px', 'fontWeight': '700'}),
-                chart4_dashboard
-            ], style={
-                'background': '#fff',
-                'padding': '30px',
-                'borderRadius': '15px',
-                'boxShadow': '0 4px 15px rgba(0,0,0,0.08)',
-                'border': '1px solid #e3e6eb',
-                'height': '550px'
-            })
-        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top'}),
-
-        html.Div([
-            html.Div([
-                html.H3("Salary vs Loan Comparison", 
-                        style={'color': '#2c3e50', 'marginBottom': '20px', 'fontSize': '18px', 'fontWeight': '700'}),
-                chart5_dashboard
-            ], style={
-                'background': '#fff',
-                'padding': '30px',
-                'borderRadius': '15px',
-                'boxShadow': '0 4px 15px rgba(0,0,0,0.08)',
-                'border': '1px solid #e3e6eb',
-                'height': '550px'
-            })
-        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top', 'marginLeft': '2%'}),
-    ])
-])
-
-# Country-wise Layout
-countrywise_layout = html.Div([
-    html.Div([
-        html.H1("Country-wise Market Analysis", 
-                style={'color': '#1e3c72', 'fontSize': '38px', 'fontWeight': '800', 'marginBottom': '10px', 'letterSpacing': '-0.5px'}),
-        html.P("Detailed insights by location and filters", 
-               style={'color': '#6c757d', 'fontSize': '15px', 'marginBottom': '0'})
-    ], style={'marginBottom': '35px'}),
-    
-    html.Div([
-        html.Label("Country:", style={'fontWeight': '700', 'fontSize': '15px', 'marginRight': '15px', 'color': '#2c3e50'}),
-        country_dropdown_main
-    ], style={'marginBottom': '40px', 'background': 'white', 'padding': '25px 30px', 'borderRadius': '12px', 
-              'boxShadow': '0 4px 15px rgba(0,0,0,0.08)', 'display': 'inline-block', 'border': '1px solid #e3e6eb'}),
-    
-    # Row 1 - Single Large Chart
-    html.Div([
-        html.Div([
-            html.H3("Average Property Price by Type", style={'color': '#2c3e50', 'fontSize': '20px', 'fontWeight': '700', 'marginBottom': '20px'}),
-            city_dropdown_country,
-            chart1_country
-        ], style={'background': 'white', 'padding': '35px', 'borderRadius': '15px', 'boxShadow': '0 4px 15px rgba(0,0,0,0.08)', 'height': '650px', 'border': '1px solid #e3e6eb'})
-    ], style={'marginBottom': '35px'}),
-    
-    # Row 2 - Two Charts Side by Side
-    html.Div([
-        html.Div([
-            html.Div([
-                html.H3("Property Type Analysis", style={'color': '#2c3e50', 'fontSize': '19px', 'fontWeight': '700', 'marginBottom': '20px'}),
-                furnishing_dropdown_country,
-                chart2_country
-            ], style={'background': 'white', 'padding': '35px', 'borderRadius': '15px', 'boxShadow': '0 4px 15px rgba(0,0,0,0.08)', 'height': '700px', 'border': '1px solid #e3e6eb'})
-        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top'}),
-        
-        html.Div([
-            html.Div([
-                html.H3("Financial Requirements", style={'color': '#2c3e50', 'fontSize': '19px', 'fontWeight': '700', 'marginBottom': '20px'}),
-                financial_metric_dropdown_country,
-                chart3_country
-            ], style={'background': 'white', 'padding': '35px', 'borderRadius': '15px', 'boxShadow': '0 4px 15px rgba(0,0,0,0.08)', 'height': '700px', 'border': '1px solid #e3e6eb'})
-        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top', 'marginLeft': '2%'}),
-    ], style={'marginBottom': '35px'}),
-    
-    # Row 3 - Two Charts Side by Side
-    html.Div([
-        html.Div([
-            html.Div([
-                html.H3("Price by Room Count", style={'color': '#2c3e50', 'fontSize': '19px', 'fontWeight': '700', 'marginBottom': '20px'}),
-                rooms_dropdown_country,
-                chart4_country
-            ], style={'background': 'white', 'padding': '35px', 'borderRadius': '15px', 'boxShadow': '0 4px 15px rgba(0,0,0,0.08)', 'height': '650px', 'border': '1px solid #e3e6eb'})
-        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top'}),
-        
-        html.Div([
-            html.Div([
-                html.H3("Price by Connectivity", style={'color': '#2c3e50', 'fontSize': '19px', 'fontWeight': '700', 'marginBottom': '20px'}),
-                connectivity_dropdown_country,
-                chart5_country
-            ], style={'background': 'white', 'padding': '35px', 'borderRadius': '15px', 'boxShadow': '0 4px 15px rgba(0,0,0,0.08)', 'height': '650px', 'border': '1px solid #e3e6eb'})
-        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top', 'marginLeft': '2%'}),
-    ])
-])
-
-content = html.Div([dcc.Location(id='url', refresh=False), html.Div(id='page-content')], style=CONTENT_STYLE)
-
-app.layout = html.Div([
-    sidebar, content,
-    html.Div([
-        chart1_dashboard, chart2_dashboard, chart3_dashboard, chart4_dashboard, chart5_dashboard,
-        metric_dropdown_dashboard, country_dropdown_main, city_dropdown_country, 
-        furnishing_dropdown_country, financial_metric_dropdown_country, 
-        rooms_dropdown_country, connectivity_dropdown_country,
-        chart1_country, chart2_country, chart3_country, chart4_country, chart5_country
-    ], style={'display': 'none'})
-], style={'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif'})
-
-# Callbacks
-@app.callback(Output('page-content', 'children'), Input('url', 'pathname'))
-def display_page(pathname):
-    return countrywise_layout if pathname == '/country-wise' else dashboard_layout
-
-@app.callback(Output('chart1-dashboard', 'figure'), Input('chart1-dashboard', 'id'))
-def update_dashboard_chart1(_):
-    df['price_per_sqft'] = df['price'] / df['property_size_sqft']
-    country_data = df.groupby('country')['price_per_sqft'].mean().reset_index()
-    fig = px.choropleth(country_data, locations='country', locationmode='country names',
-                        color='price_per_sqft', hover_name='country',
-                        color_continuous_scale='Blues',
-                        labels={'price_per_sqft': 'Price per Sqft ($)'})
-    fig.update_layout(height=420, margin=dict(l=5, r=5, t=5, b=5),
-                      geo=dict(showframe=False, showcoastlines=True, projection_type='natural earth'))
-    return fig
-
-@app.callback(Output('chart2-dashboard', 'figure'), Input('chart2-dashboard', 'id'))
-def update_dashboard_chart2(_):
-    heatmap_data = df.groupby(['country', 'property_type']).size().reset_index(name='count')
-    heatmap_pivot = heatmap_data.pivot(index='country', columns='property_type', values='count').fillna(0)
-    fig = px.imshow(heatmap_pivot, x=heatmap_pivot.columns, y=heatmap_pivot.index,
-                    color_continuous_scale='Blues', aspect="auto",
-                    labels=dict(x="Property Type", y="Country", color="Count"))
-    fig.update_layout(height=470, margin=dict(l=5, r=5, t=5, b=5))
-    fig.update_xaxes(tickangle=-45)
-    return fig
-
-@app.callback(Output('chart3-dashboard', 'figure'), Input('metric-dropdown-dashboard', 'value'))
-def update_dashboard_chart3(metric):
-    data = df.groupby('country')[metric].mean().reset_index().sort_values(metric, ascending=False)
-    fig = px.bar(data, x='country', y=metric, color=metric, color_continuous_scale='Viridis')
-    fig.update_layout(height=450, margin=dict(l=5, r=5, t=5, b=5), showlegend=False)
-    fig.update_xaxes(tickangle=-45)
-    return fig
-
-@app.callback(Output('chart4-dashboard', 'figure'), Input('chart4-dashboard', 'id'))
-def update_dashboard_chart4(_):
-    fig = px.box(df, x='country', y='customer_salary', color='country')
-    fig.update_layout(height=470, margin=dict(l=5, r=5, t=5, b=5), showlegend=False)
-    fig.update_xaxes(tickangle=-45)
-    return fig
-
-@app.callback(Output('chart5-dashboard', 'figure'), Input('chart5-dashboard', 'id'))
-def update_dashboard_chart5(_):
-    data = df.groupby('country').agg({'customer_salary': 'mean', 'loan_amount': 'mean'}).reset_index()
-    fig = go.Figure()
-    fig.add_trace(go.Bar(x=data['country'], y=data['customer_salary'], name='Avg Salary', marker_color='#3498db'))
-    fig.add_trace(go.Bar(x=data['country'], y=data['loan_amount'], name='Avg Loan', marker_color='#e74c3c'))
-    fig.update_layout(height=470, margin=dict(l=5, r=5, t=5, b=5), barmode='group',
-                      legend=dict(orientation="h", yanchor="top", y=1.1, xanchor="center", x=0.5))
-    fig.update_xaxes(tickangle=-45)
-    return fig
-
-@app.callback(Output('city-dropdown-country', 'options'), Output('city-dropdown-country', 'value'), Input('country-dropdown-main', 'value'))
-def populate_cities(country):
-    if not country: return [], None
-    cities = sorted(df[df['country'] == country]['city'].unique())
-    return [{'label': c, 'value': c} for c in cities], cities[0] if cities else None
-
-@app.callback(Output('chart1-country', 'figure'), Input('country-dropdown-main', 'value'), Input('city-dropdown-country', 'value'))
-def update_country_chart1(country, city):
-    if not country or not city: return px.bar().update_layout(height=530)
-    filtered = df[(df['country'] == country) & (df['city'] == city)]
-    if filtered.empty: return px.bar().update_layout(height=530)
-    data = filtered.groupby('property_type')['price'].mean().reset_index().sort_values('price', ascending=False)
-    fig = px.bar(data, x='property_type', y='price', color='property_type',
-                 labels={'price': 'Average Price ($)', 'property_type': 'Property Type'})
-    fig.update_layout(height=530, margin=dict(l=5, r=5, t=5, b=5), showlegend=False)
-    fig.update_xaxes(tickangle=-45)
-    return fig
-
-@app.callback(Output('furnishing-dropdown-country', 'options'), Output('furnishing-dropdown-country', 'value'),
-              Input('country-dropdown-main', 'value'), Input('city-dropdown-country', 'value'))
-def populate_furnishing(country, city):
-    if not country or not city: return [], None
-    filtered = df[(df['country'] == country) & (df['city'] == city)]
-    furn = sorted(filtered['furnishing_status'].unique())
-    return [{'label': f, 'value': f} for f in furn], furn[0] if furn else None
-
-@app.callback(Output('chart2-country', 'figure'), Input('country-dropdown-main', 'value'), 
-              Input('city-dropdown-country', 'value'), Input('furnishing-dropdown-country', 'value'))
-def update_country_chart2(country, city, furnishing):
-    if not all([country, city, furnishing]): return px.scatter().update_layout(height=600)
-    filtered = df[(df['country'] == country) & (df['city'] == city) & (df['furnishing_status'] == furnishing)]
-    if filtered.empty: return px.scatter().update_layout(height=600)
-    data = filtered.groupby('property_type').agg({'price': 'mean', 'property_size_sqft': 'mean'}).reset_index()
-    fig = px.scatter(data, x='property_size_sqft', y='price', size='price', color='property_type', 
-                     text='property_type', size_max=70,
-                     labels={'price': 'Avg Price ($)', 'property_size_sqft': 'Size (sqft)', 'property_type': 'Type'})
-    fig.update_traces(textposition='top center')
-    fig.update_layout(height=600, margin=dict(l=5, r=5, t=60, b=5),
-                      legend=dict(orientation="h", yanchor="top", y=1.12, xanchor="center", x=0.5))
-    return fig
-
-@app.callback(Output('chart3-country', 'figure'), Input('country-dropdown-main', 'value'), 
-              Input('city-dropdown-country', 'value'), Input('furnishing-dropdown-country', 'value'),
-              Input('financial-metric-dropdown-country', 'value'))
-def update_country_chart3(country, city, furnishing, metric):
-    if not all([country, city, furnishing]): return px.bar().update_layout(height=600)
-    filtered = df[(df['country'] == country) & (df['city'] == city) & (df['furnishing_status'] == furnishing)]
-    if filtered.empty: return px.bar().update_layout(height=600)
-    data = filtered.groupby('property_type')[metric].mean().reset_index().sort_values(metric, ascending=False)
-    fig = px.bar(data, x='property_type', y=metric, color='property_type',
-                 labels={metric: 'Amount ($)', 'property_type': 'Type'})
-    fig.update_layout(height=600, margin=dict(l=5, r=5, t=60, b=5),
-                      legend=dict(orientation="h", yanchor="top", y=1.12, xanchor="center", x=0.5))
-    fig.update_xaxes(tickangle=-45)
-    return fig
-
-@app.callback(Output('rooms-dropdown-country', 'options'), Output('rooms-dropdown-country', 'value'),
-              Input('country-dropdown-main', 'value'), Input('city-dropdown-country', 'value'),
-              Input('furnishing-dropdown-country', 'value'))
-def populate_rooms(country, city, furnishing):
-    if not all([country, city, furnishing]): return [], None
-    filtered = df[(df['country'] == country) & (df['city'] == city) & (df['furnishing_status'] == furnishing)]
-    rooms = sorted(filtered['rooms'].unique())
-    return [{'label': f'{r} Rooms', 'value': r} for r in rooms], rooms[0] if rooms else None
-
-@app.callback(Output('chart4-country', 'figure'), Input('country-dropdown-main', 'value'),
-              Input('city-dropdown-country', 'value'), Input('furnishing-dropdown-country', 'value'),
-              Input('rooms-dropdown-country', 'value'))
-def update_country_chart4(country, city, furnishing, rooms):
-    if not all([country, city, furnishing, rooms]): 
-        return px.pie(title='Select all filters').update_layout(height=530)
-    filtered = df[(df['country'] == country) & (df['city'] == city) & 
-                  (df['furnishing_status'] == furnishing) & (df['rooms'] == rooms)]
-    if filtered.empty: 
-        return px.pie(title='No data available').update_layout(height=530)
-    data = filtered.groupby('property_type')['price'].mean().reset_index().sort_values('price', ascending=False)
-    fig = px.pie(data, values='price', names='property_type', 
-                 title=f'Price Distribution by Property Type<br>{rooms} Rooms in {city}',
-                 labels={'property_type': 'Property Type', 'price': 'Avg Price'},
-                 hole=0.4,  # Makes it a donut chart
-                 color_discrete_sequence=px.colors.qualitative.Set3)
-    fig.update_traces(
-        textposition='inside',
-        textinfo='percent+label',
-        hovertemplate='<b>%{label}</b><br>Avg Price: $%{value:,.0f}<br>Percentage: %{percent}<extra></extra>',
-        pull=[0.05 if i == 0 else 0 for i in range(len(data))]  # Pull out the largest slice
-    )
-    fig.update_layout(
-        height=530, 
-        margin=dict(l=5, r=5, t=60, b=5),
-        showlegend=True,
-        legend=dict(
-            orientation="v",
-            yanchor="middle",
-            y=0.5,
-            xanchor="left",
-            x=1.05
-        )
-    )
-    return fig
-
-@app.callback(Output('connectivity-dropdown-country', 'options'), Output('connectivity-dropdown-country', 'value'),
-              Input('country-dropdown-main', 'value'), Input('city-dropdown-country', 'value'))
-def populate_connectivity(country, city):
-    if not country or not city: return [], None
-    filtered = df[(df['country'] == country) & (df['city'] == city)]
-    conn = sorted(filtered['connectivity_score'].unique())
-    return [{'label': f'Score {c}', 'value': c} for c in conn], conn[0] if conn else None
-
-@app.callback(Output('chart5-country', 'figure'), Input('country-dropdown-main', 'value'),
-              Input('city-dropdown-country', 'value'), Input('connectivity-dropdown-country', 'value'))
-def update_country_chart5(country, city, connectivity):
-    if not all([country, city, connectivity]): 
-        return px.pie(title='Select all filters').update_layout(height=530)
-    filtered = df[(df['country'] == country) & (df['city'] == city) & (df['connectivity_score'] == connectivity)]
-    if filtered.empty: 
-        return px.pie(title='No data available').update_layout(height=530)
-    data = filtered.groupby('property_type')['price'].mean().reset_index().sort_values('price', ascending=False)
-    fig = px.pie(data, values='price', names='property_type',
-                 title=f'Price Distribution by Property Type<br>Connectivity Score: {connectivity} in {city}',
-                 labels={'property_type': 'Property Type', 'price': 'Avg Price'},
-                 hole=0.4,  # Makes it a donut chart
-                 color_discrete_sequence=px.colors.qualitative.Pastel)
-    fig.update_traces(
-        textposition='inside',
-        textinfo='percent+label',
-        hovertemplate='<b>%{label}</b><br>Avg Price: $%{value:,.0f}<br>Percentage: %{percent}<extra></extra>',
-        pull=[0.05 if i == 0 else 0 for i in range(len(data))]  # Pull out the largest slice
-    )
-    fig.update_layout(
-        height=530, 
-        margin=dict(l=5, r=5, t=60, b=5),
-        showlegend=True,
-        legend=dict(
-            orientation="v",
-            yanchor="middle",
-            y=0.5,
-            xanchor="left",
-            x=1.05
-        )
-    )
-    return fig
-
-if __name__ == '__main__':
+import collections
+import functools
+import hashlib
+import json
+import os
+import threading
+import uuid
+
+import dash
+from dash import dcc, html
+from dash.dependencies import Input, Output, State
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+
+import backends
+import compression
+import figures
+import ingestion
+import memo
+import metrics
+from dataset import DATA_PATH, read_dataset, source_digest
+from metrics import stage, timed_stage
+
+# print("Libraries imported!")
+
+# DASH_CLIENTSIDE_CHARTS=1 renders the country page in the browser (assets/country_charts.js):
+# the server only answers country and city changes, with the city's aggregate table.
+CLIENTSIDE_CHARTS = os.environ.get('DASH_CLIENTSIDE_CHARTS') == '1'
+
+# DASH_SHARED_DATA=1 maps the dataset read-only from its binary cache instead of holding a
+# private copy, so gunicorn workers share one copy through the OS page cache.
+SHARED_DATA = os.environ.get('DASH_SHARED_DATA') == '1'
+
+# DASH_INGEST_DIR names a drop directory of CSV batches that every worker appends without
+# a restart (see ingestion.py); setting DASH_INGEST_TOKEN also mounts POST /ingest, guarded by it.
+INGEST_DIR = os.environ.get('DASH_INGEST_DIR')
+
+# DASH_DATA_BACKEND=parquet reads the rows from country-partitioned Parquet through DuckDB
+# instead of holding them in a pandas frame (see backends.py).
+DATA_BACKEND = os.environ.get('DASH_DATA_BACKEND', 'pandas')
+
+# Derived columns
+# Computed columns, given as expressions that read the same in pandas and in SQL so every
+# data backend computes them: materialized once by the pandas backend, inside the scan
+# by the Parquet one. Callbacks and charts reference them by name like stored columns.
+DERIVED_COLUMNS = {
+    'price_per_sqft': 'price / property_size_sqft',
+    'loan_to_salary': 'loan_amount / customer_salary',
+    'down_payment_pct': 'down_payment / price * 100',
+}
+
+# Snapshot
+# Everything derived from the dataset lives in one Snapshot that is replaced whole by
+# load_data() or ingest(), never mutated. Callbacks are pinned to the snapshot that was
+# live when they started, so a swap mid-request never mixes two versions.
+Snapshot = collections.namedtuple('Snapshot', ['source', 'cube', 'filter_index', 'figures', 'version'])
+snapshot = None
+_pinned = threading.local()
+
+def current():
+    return getattr(_pinned, 'snapshot', None) or snapshot
+
+def pinned(fn):
+    @functools.wraps(fn)
+    def wrapper(*args):
+        _pinned.snapshot = snapshot
+        try:
+            return fn(*args)
+        finally:
+            _pinned.snapshot = None
+    return wrapper
+
+# Aggregate cube
+# Sum/count/mean of every measure keyed by the country-page filter columns, rolled
+# up once per filter combination so the callbacks answer with a dict lookup. Sums and
+# counts merge, so new rows are folded in without rescanning the old ones.
+CUBE_DIMS = ['country', 'city', 'furnishing_status', 'rooms', 'connectivity_score', 'property_type']
+CUBE_MEASURES = ['price', 'property_size_sqft', 'customer_salary', 'down_payment', 'loan_amount', *DERIVED_COLUMNS]
+CUBE_VIEWS = {
+    'city': ['country', 'city'],
+    'furnishing': ['country', 'city', 'furnishing_status'],
+    'rooms': ['country', 'city', 'furnishing_status', 'rooms'],
+    'connectivity': ['country', 'city', 'connectivity_score'],
+}
+
+def roll_up_views(base):
+    views = {}
+    for view, keys in CUBE_VIEWS.items():
+        rolled = base.groupby(level=keys + ['property_type']).sum()
+        tables = {}
+        for key, table in rolled.groupby(level=keys):
+            table = table.droplevel(keys)
+            tables[key] = {'sum': table['sum'], 'count': table['count'],
+                           'mean': table['sum'] / table['count']}
+        views[view] = tables
+    return views
+
+def assemble_cube(base, rows, views):
+    return {'base': base, 'rows': rows, 'views': views,
+            'countries': base.groupby(level='country').sum(),
+            'country_types': rows.groupby(level=['country', 'property_type']).sum()}
+
+def build_cube(source):
+    """The cube of every row in a data backend, aggregated by the backend itself."""
+    base, rows = source.aggregate(CUBE_DIMS, CUBE_MEASURES)
+    return assemble_cube(base, rows, roll_up_views(base))
+
+def merge_cube(cube, data):
+    """cube with data's rows added. Only the views of cities present in data are rolled up
+    again; every other city's tables are shared with the old cube."""
+    added, added_rows = backends.aggregate_frame(data, CUBE_DIMS, CUBE_MEASURES)
+    # add() upcasts to float where the indexes differ; counts go back to integers.
+    base = cube['base'].add(added, fill_value=0).astype({col: 'int64' for col in added.columns if col[0] == 'count'})
+    rows = cube['rows'].add(added_rows, fill_value=0).astype('int64')
+    cities = added.index.droplevel(CUBE_DIMS[2:]).unique()
+    touched = base[base.index.droplevel(CUBE_DIMS[2:]).isin(cities)]
+    views = {view: dict(tables) for view, tables in cube['views'].items()}
+    for view, tables in roll_up_views(touched).items():
+        views[view].update(tables)
+    return assemble_cube(base, rows, views)
+
+@timed_stage('aggregate')
+def cube_means(view, key, measures):
+    """Per-property_type means for one filter combination, or None when it has no rows."""
+    table = current().cube['views'][view].get(key)
+    if table is None: return None
+    return table['mean'][measures].reset_index()
+
+@timed_stage('aggregate')
+def country_means(measures):
+    countries = current().cube['countries']
+    return (countries['sum'][measures] / countries['count'][measures]).reset_index()
+
+# Filter index
+# Nested country -> city -> furnishing_status -> rooms (and city -> connectivity_score)
+# tree of the values present under each filter prefix, children in sorted order, so
+# dropdown options are dict lookups instead of scans. It is built from the distinct
+# cube keys, so its size depends on the filter combinations, not on the row count.
+FILTER_HIERARCHIES = [
+    ['country', 'city', 'furnishing_status', 'rooms'],
+    ['country', 'city', 'connectivity_score'],
+]
+
+def build_filter_index(combos):
+    """Index of combos, a frame with a column per CUBE_DIMS (rows with a missing key are skipped)."""
+    root = {'children': {}}
+    combos = combos[CUBE_DIMS].dropna()
+    for levels in FILTER_HIERARCHIES:
+        for key in sorted(combos[levels].drop_duplicates().itertuples(index=False, name=None)):
+            node = root
+            for col, value in zip(levels, key):
+                node = node['children'].setdefault(col, {}).setdefault(value, {'children': {}})
+    return root
+
+def merge_filter_index(index, added):
+    """index with added's values included; subtrees added does not touch are shared."""
+    children = {col: dict(nodes) for col, nodes in index['children'].items()}
+    for col, nodes in added['children'].items():
+        merged = children.setdefault(col, {})
+        for value, node in nodes.items():
+            merged[value] = merge_filter_index(merged[value], node) if value in merged else node
+    if any(list(nodes) != sorted(nodes) for nodes in children.values()):
+        children = {col: dict(sorted(nodes.items())) for col, nodes in children.items()}
+    return {'children': children}
+
+def filter_node(*path, index=None):
+    """Walk (column, value) pairs down the filter index; None when the combination has no rows."""
+    node = current().filter_index if index is None else index
+    for col, value in path:
+        node = node['children'].get(col, {}).get(value)
+        if node is None: return None
+    return node
+
+@timed_stage('filter')
+def filter_options(col, *path):
+    node = filter_node(*path)
+    return list(node['children'].get(col, {})) if node else []
+
+# Box summaries
+# Quartiles, whisker fences and an evenly spaced, capped sample of outliers per group,
+# computed by the data backend, so box plots ship a few numbers per box instead of every
+# row. DASH_BOX_SUMMARY=0 sends the raw rows to the browser instead, which needs them in
+# memory and so only applies to the pandas backend.
+BOX_SUMMARY = os.environ.get('DASH_BOX_SUMMARY', '1') == '1' or DATA_BACKEND != 'pandas'
+BOX_OUTLIER_CAP = 50
+
+def summary_box_figure(x, y):
+    """Precomputed-quartile equivalent of px.box(rows, x=x, y=y, color=x)."""
+    with stage('aggregate'):
+        summaries = current().source.box_summaries(x, y, BOX_OUTLIER_CAP)
+    fig = go.Figure()
+    colors = px.colors.qualitative.Plotly
+    for i, (group, stats) in enumerate(summaries.items()):
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Box(x=[group], name=str(group), marker_color=color, boxpoints=False,
+                             **{stat: [stats[stat]] for stat in ['q1', 'median', 'q3', 'lowerfence', 'upperfence']}))
+        if len(stats['outliers']):
+            fig.add_trace(go.Scatter(x=[group] * len(stats['outliers']), y=stats['outliers'], mode='markers',
+                                     name=str(group), marker_color=color, showlegend=False))
+    fig.update_layout(boxmode='overlay', xaxis_title=x, yaxis_title=y)
+    return fig
+
+# Figure cache
+# Figures that depend only on the data are built once per snapshot, serialized to Plotly
+# JSON and served from memory; a new snapshot starts with an empty cache.
+def cache_figure(fn):
+    """Serve fn's figure from the snapshot's figure cache, keyed by its arguments."""
+    @functools.wraps(fn)
+    def wrapper(*args):
+        cache = current().figures
+        key = (fn.__name__,) + args
+        fig = cache.get(key)
+        if fig is None:
+            fig = cache[key] = json.loads(to_json_plotly(fn(*args)))
+        return fig
+    return wrapper
+
+# Callback memo
+# Results of the filter-driven callbacks, keyed by their inputs and the dataset version,
+# in a bounded LRU store that gunicorn workers can share (see memo.py). With
+# DASH_FIGURE_SNAPSHOT they are all rendered ahead of time instead (see precompute.py).
+memo_store = memo.store_from_env()
+memoize = memo.memoizer(memo_store, lambda: current().version)
+
+# Load data
+def open_source(path=DATA_PATH):
+    if DATA_BACKEND == 'parquet':
+        return backends.ParquetBackend(backends.PARQUET_DIR, DERIVED_COLUMNS)
+    df = backends.with_derived(read_dataset(path, mmap=SHARED_DATA), DERIVED_COLUMNS)
+    # Named by content, so a copied or redeployed CSV keeps its version (and snapshot keys).
+    return backends.PandasBackend(df, DERIVED_COLUMNS, source_digest(path)[:16])
+
+def load_data(path=DATA_PATH):
+    """(Re)load the dataset and rebuild every structure derived from it."""
+    global snapshot
+    source = open_source(path)
+    if snapshot is not None and snapshot.version != source.version:
+        memo_store.clear()  # the store may be shared, so only wipe it when the data really changed
+    cube = build_cube(source)
+    snapshot = Snapshot(source, cube, build_filter_index(cube['rows'].index.to_frame()), {}, source.version)
+    if isinstance(memo_store, memo.PrecomputedStore):
+        memo_store.check_version(source.version)
+
+load_data()
+
+# Ingestion
+# New purchase records are appended without a restart: the cube and filter index are
+# merged with the batch rather than rebuilt, then a new snapshot is swapped in.
+_ingest_lock = threading.Lock()
+
+def check_batch(batch):
+    """Raise ValueError unless batch has the dataset's columns and column types."""
+    ingestion.check_batch(batch, current().source.columns, current().source.numeric)
+
+def ingest(batch, name=None):
+    """Append a batch of purchase records and swap in a snapshot that includes them."""
+    global snapshot
+    check_batch(batch)
+    name = name or uuid.uuid4().hex
+    with _ingest_lock:
+        live = snapshot
+        appended = live.source.append(batch, name)
+        if appended is None: return 0  # the backend already holds this batch
+        source, added = appended
+        version = hashlib.sha1(f"{live.version}+{name}".encode()).hexdigest()[:16]
+        snapshot = Snapshot(source, merge_cube(live.cube, added),
+                            merge_filter_index(live.filter_index, build_filter_index(added)), {}, version)
+    warm_figure_cache()
+    return len(added)
+
+# Initialize app
+app = dash.Dash(__name__)
+server = app.server 
+_register_callback = metrics.instrument(app)
+compression.register(server)
+
+def callback(*args, **kwargs):
+    """app.callback, profiled and pinned to the snapshot that is live when each call starts."""
+    register = _register_callback(*args, **kwargs)
+    return lambda fn: register(pinned(fn))
+
+# Styles
+SIDEBAR_STYLE = {
+    "position": "fixed",
+    "top": 0,
+    "left": 0,
+    "bottom": 0,
+    "width": "250px",
+    "padding": "35px 25px",
+    "background": "linear-gradient(180deg, #1e3c72 0%, #2a5298 100%)",
+    "boxShadow": "4px 0 15px rgba(0,0,0,0.15)",
+    "zIndex": "1000"
+}
+
+CONTENT_STYLE = {
+    "marginLeft": "270px",
+    "marginRight": "20px",
+    "padding": "40px",
+    "backgroundColor": "#f5f6fa",
+    "minHeight": "100vh"
+}
+
+# Define chart components
+chart1_dashboard = dcc.Graph(id='chart1-dashboard', config={'displayModeBar': False})
+chart2_dashboard = dcc.Graph(id='chart2-dashboard', config={'displayModeBar': False})
+chart3_dashboard = dcc.Graph(id='chart3-dashboard', config={'displayModeBar': False})
+chart4_dashboard = dcc.Graph(id='chart4-dashboard', config={'displayModeBar': False})
+chart5_dashboard = dcc.Graph(id='chart5-dashboard', config={'displayModeBar': False})
+
+metric_dropdown_dashboard = dcc.Dropdown(
+    id='metric-dropdown-dashboard',
+    options=[
+        {'label': 'Loan Amount', 'value': 'loan_amount'},
+        {'label': 'Down Payment', 'value': 'down_payment'}
+    ],
+    value='loan_amount',
+    style={'marginBottom': '20px', 'fontSize': '14px'}
+)
+
+# Country-wise components
+country_dropdown_main = dcc.Dropdown(
+    id='country-dropdown-main',
+    options=[{'label': c, 'value': c} for c in filter_options('country')],
+    value='USA',
+    placeholder='Select a country...',
+    style={'width': '300px', 'fontSize': '14px'}
+)
+
+city_dropdown_country = dcc.Dropdown(id='city-dropdown-country', options=[], placeholder='Select a city...', style={'marginBottom': '20px', 'fontSize': '14px'})
+furnishing_dropdown_country = dcc.Dropdown(id='furnishing-dropdown-country', options=[], placeholder='Select furnishing...', style={'marginBottom': '20px', 'fontSize': '14px'})
+financial_metric_dropdown_country = dcc.Dropdown(
+    id='financial-metric-dropdown-country',
+    options=[
+        {'label': 'Avg Salary', 'value': 'customer_salary'},
+        {'label': 'Avg Down Payment', 'value': 'down_payment'},
+        {'label': 'Avg Loan Amount', 'value': 'loan_amount'}
+    ],
+    value='customer_salary',
+    style={'marginBottom': '20px', 'fontSize': '14px'}
+)
+rooms_dropdown_country = dcc.Dropdown(id='rooms-dropdown-country', options=[], placeholder='Select rooms...', style={'marginBottom': '20px', 'fontSize': '14px'})
+connectivity_dropdown_country = dcc.Dropdown(id='connectivity-dropdown-country', options=[], placeholder='Select connectivity...', style={'marginBottom': '20px', 'fontSize': '14px'})
+
+chart1_country = dcc.Graph(id='chart1-country', config={'displayModeBar': False})
+chart2_country = dcc.Graph(id='chart2-country', config={'displayModeBar': False})
+chart3_country = dcc.Graph(id='chart3-country', config={'displayModeBar': False})
+chart4_country = dcc.Graph(id='chart4-country', config={'displayModeBar': False})
+chart5_country = dcc.Graph(id='chart5-country', config={'displayModeBar': False})
+
+# Client-side rendering stores: the selected city's aggregate table, and the figure
+# skeletons the browser fills in (both only populated when CLIENTSIDE_CHARTS is on).
+city_aggregates_store = dcc.Store(id='city-aggregates')
+country_skeletons_store = dcc.Store(id='country-chart-skeletons')
+
+# Sidebar
+sidebar = html.Div([
+    html.Div([
+        html.H2("Global House Purchase Dashboard", style={"color": "#fff", "fontSize": "30px", "fontWeight": "800", "marginBottom": "5px", "letterSpacing": "0.5px"}),
+        html.P("Analytics Dashboard", style={"color": "rgba(255,255,255,0.75)", "fontSize": "14px", "marginBottom": "50px", "fontWeight": "300"})
+    ]),
+    
+    dcc.Link(
+    html.Div([
+        html.Div("📊", style={"fontSize": "18px", "marginBottom": "4px"}),  # smaller icon
+        html.Div("Dashboard", style={"fontSize": "14px", "fontWeight": "600"})  # smaller text
+    ], style={"textAlign": "center"}),
+    href="/",
+    style={
+        "display": "block",
+        "padding": "8px 12px",   # reduced padding
+        "color": "#fff",
+        "textDecoration": "none",
+        "borderRadius": "8px",   # smaller radius
+        "marginBottom": "8px",   # less spacing below
+        "background": "rgba(255,255,255,0.15)",
+        "transition": "all 0.3s ease",
+        "border": "1px solid rgba(255,255,255,0.2)"  # thinner border
+    }
+),
+    
+    dcc.Link(
+        html.Div([
+            html.Div("🌍", style={"fontSize": "18px", "marginBottom": "4px"}),
+            html.Div("Country Analysis", style={"fontSize": "14px", "fontWeight": "600"})
+        ], style={"textAlign": "center"}),
+        href="/country-wise",
+        style={
+            "display": "block",
+        "padding": "8px 12px",   # reduced padding
+        "color": "#fff",
+        "textDecoration": "none",
+        "borderRadius": "8px",   # smaller radius
+        "marginBottom": "8px",   # less spacing below
+        "background": "rgba(255,255,255,0.15)",
+        "transition": "all 0.3s ease",
+        "border": "1px solid rgba(255,255,255,0.2)"  # thinner border
+        }
+    )
+], style=SIDEBAR_STYLE)
+
+# Dashboard Layout
+dashboard_layout = html.Div([
+    html.Div([
+        html.H1("Global Comparision", 
+                style={'color': '#1e3c72', 'fontSize': '38px', 'fontWeight': '800', 'marginBottom': '10px', 'letterSpacing': '-0.5px'}),
+        html.P("Comprehensive market overview and insights", 
+               style={'color': '#6c757d', 'fontSize': '15px', 'marginBottom': '0'})
+    ], style={'marginBottom': '40px'}),
+    
+    # Top Chart
+    html.Div([
+        html.Div([
+            html.H3("Country-wise Average Per Sqft Value", 
+                    style={'color': '#2c3e50', 'marginBottom': '20px', 'fontSize': '20px', 'fontWeight': '700'}),
+            chart1_dashboard
+        ], style={
+            'background': '#fff',
+            'padding': '30px',
+            'borderRadius': '15px',
+            'boxShadow': '0 4px 15px rgba(0,0,0,0.08)',
+            'border': '1px solid #e3e6eb'
+        })
+    ], style={'marginBottom': '30px'}),
+
+    # 2x2 Grid
+    html.Div([
+        html.Div([
+            html.Div([
+                html.H3("Property Type Distribution", 
+                        style={'color': '#2c3e50', 'marginBottom': '20px', 'fontSize': '18px', 'fontWeight': '700'}),
+                chart2_dashboard
+            ], style={
+                'background': '#fff',
+                'padding': '30px',
+                'borderRadius': '15px',
+                'boxShadow': '0 4px 15px rgba(0,0,0,0.08)',
+                'border': '1px solid #e3e6eb',
+                'height': '550px'
+            })
+        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top'}),
+
+        html.Div([
+            html.Div([
+                html.H3("Financial Comparison", 
+                        style={'color': '#2c3e50', 'marginBottom': '15px', 'fontSize': '18px', 'fontWeight': '700'}),
+                metric_dropdown_dashboard,
+                chart3_dashboard
+            ], style={
+                'background': '#fff',
+                'padding': '30px',
+                'borderRadius': '15px',
+                'boxShadow': '0 4px 15px rgba(0,0,0,0.08)',
+                'border': '1px solid #e3e6eb',
+                'height': '550px'
+            })
+        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top', 'marginLeft': '2%'}),
+    ], style={'marginBottom': '30px'}),
+
+    html.Div([
+        html.Div([
+            html.Div([
+                html.H3("Salary Distribution", 
+                        style={'color': '#2c3e50', 'marginBottom': '20px', 'fontSize': '18px', 'fontWeight': '700'}),
+                chart4_dashboard
+            ], style={
+                'background': '#fff',
+                'padding': '30px',
+                'borderRadius': '15px',
+                'boxShadow': '0 4px 15px rgba(0,0,0,0.08)',
+                'border': '1px solid #e3e6eb',
+                'height': '550px'
+            })
+        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top'}),
+
+        html.Div([
+            html.Div([
+                html.H3("Salary vs Loan Comparison", 
+                        style={'color': '#2c3e50', 'marginBottom': '20px', 'fontSize': '18px', 'fontWeight': '700'}),
+                chart5_dashboard
+            ], style={
+                'background': '#fff',
+                'padding': '30px',
+                'borderRadius': '15px',
+                'boxShadow': '0 4px 15px rgba(0,0,0,0.08)',
+                'border': '1px solid #e3e6eb',
+                'height': '550px'
+            })
+        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top', 'marginLeft': '2%'}),
+    ])
+])
+
+# Country-wise Layout
+countrywise_layout = html.Div([
+    city_aggregates_store, country_skeletons_store,
+    html.Div([
+        html.H1("Country-wise Market Analysis", 
+                style={'color': '#1e3c72', 'fontSize': '38px', 'fontWeight': '800', 'marginBottom': '10px', 'letterSpacing': '-0.5px'}),
+        html.P("Detailed insights by location and filters", 
+               style={'color': '#6c757d', 'fontSize': '15px', 'marginBottom': '0'})
+    ], style={'marginBottom': '35px'}),
+    
+    html.Div([
+        html.Label("Country:", style={'fontWeight': '700', 'fontSize': '15px', 'marginRight': '15px', 'color': '#2c3e50'}),
+        country_dropdown_main
+    ], style={'marginBottom': '40px', 'background': 'white', 'padding': '25px 30px', 'borderRadius': '12px', 
+              'boxShadow': '0 4px 15px rgba(0,0,0,0.08)', 'display': 'inline-block', 'border': '1px solid #e3e6eb'}),
+    
+    # Row 1 - Single Large Chart
+    html.Div([
+        html.Div([
+            html.H3("Average Property Price by Type", style={'color': '#2c3e50', 'fontSize': '20px', 'fontWeight': '700', 'marginBottom': '20px'}),
+            city_dropdown_country,
+            chart1_country
+        ], style={'background': 'white', 'padding': '35px', 'borderRadius': '15px', 'boxShadow': '0 4px 15px rgba(0,0,0,0.08)', 'height': '650px', 'border': '1px solid #e3e6eb'})
+    ], style={'marginBottom': '35px'}),
+    
+    # Row 2 - Two Charts Side by Side
+    html.Div([
+        html.Div([
+            html.Div([
+                html.H3("Property Type Analysis", style={'color': '#2c3e50', 'fontSize': '19px', 'fontWeight': '700', 'marginBottom': '20px'}),
+                furnishing_dropdown_country,
+                chart2_country
+            ], style={'background': 'white', 'padding': '35px', 'borderRadius': '15px', 'boxShadow': '0 4px 15px rgba(0,0,0,0.08)', 'height': '700px', 'border': '1px solid #e3e6eb'})
+        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top'}),
+        
+        html.Div([
+            html.Div([
+                html.H3("Financial Requirements", style={'color': '#2c3e50', 'fontSize': '19px', 'fontWeight': '700', 'marginBottom': '20px'}),
+                financial_metric_dropdown_country,
+                chart3_country
+            ], style={'background': 'white', 'padding': '35px', 'borderRadius': '15px', 'boxShadow': '0 4px 15px rgba(0,0,0,0.08)', 'height': '700px', 'border': '1px solid #e3e6eb'})
+        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top', 'marginLeft': '2%'}),
+    ], style={'marginBottom': '35px'}),
+    
+    # Row 3 - Two Charts Side by Side
+    html.Div([
+        html.Div([
+            html.Div([
+                html.H3("Price by Room Count", style={'color': '#2c3e50', 'fontSize': '19px', 'fontWeight': '700', 'marginBottom': '20px'}),
+                rooms_dropdown_country,
+                chart4_country
+            ], style={'background': 'white', 'padding': '35px', 'borderRadius': '15px', 'boxShadow': '0 4px 15px rgba(0,0,0,0.08)', 'height': '650px', 'border': '1px solid #e3e6eb'})
+        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top'}),
+        
+        html.Div([
+            html.Div([
+                html.H3("Price by Connectivity", style={'color': '#2c3e50', 'fontSize': '19px', 'fontWeight': '700', 'marginBottom': '20px'}),
+                connectivity_dropdown_country,
+                chart5_country
+            ], style={'background': 'white', 'padding': '35px', 'borderRadius': '15px', 'boxShadow': '0 4px 15px rgba(0,0,0,0.08)', 'height': '650px', 'border': '1px solid #e3e6eb'})
+        ], style={'width': '49%', 'display': 'inline-block', 'verticalAlign': 'top', 'marginLeft': '2%'}),
+    ])
+])
+
+content = html.Div([dcc.Location(id='url', refresh=False), html.Div(id='page-content')], style=CONTENT_STYLE)
+
+# Each page's components exist only while that page is shown, so a page load runs just
+# the callbacks it renders; validation_layout lets Dash check callbacks against both pages.
+app.layout = html.Div([sidebar, content],
+                      style={'fontFamily': '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif'})
+app.validation_layout = html.Div([sidebar, content, dashboard_layout, countrywise_layout])
+
+# Figures
+# Charts are defined with plotly.express as functions of their aggregated data, and
+# served by filling the data into a template of that px output (see figures.py).
+@figures.chart(lambda fig, data: figures.choropleth(fig, data['country'], data['price_per_sqft']))
+def price_map_figure(country_data):
+    fig = px.choropleth(country_data, locations='country', locationmode='country names',
+                        color='price_per_sqft', hover_name='country',
+                        color_continuous_scale='Blues',
+                        labels={'price_per_sqft': 'Price per Sqft ($)'})
+    fig.update_layout(height=420, margin=dict(l=5, r=5, t=5, b=5),
+                      geo=dict(showframe=False, showcoastlines=True, projection_type='natural earth'))
+    return fig
+
+@figures.chart(figures.heatmap)
+def type_heatmap_figure(heatmap_pivot):
+    fig = px.imshow(heatmap_pivot, x=heatmap_pivot.columns, y=heatmap_pivot.index,
+                    color_continuous_scale='Blues', aspect="auto",
+                    labels=dict(x="Property Type", y="Country", color="Count"))
+    fig.update_layout(height=470, margin=dict(l=5, r=5, t=5, b=5))
+    fig.update_xaxes(tickangle=-45)
+    return fig
+
+@figures.chart(lambda fig, data, metric: figures.continuous_bars(fig, data['country'], data[metric]))
+def country_metric_figure(data, metric):
+    fig = px.bar(data, x='country', y=metric, color=metric, color_continuous_scale='Viridis')
+    fig.update_layout(height=450, margin=dict(l=5, r=5, t=5, b=5), showlegend=False)
+    fig.update_xaxes(tickangle=-45)
+    return fig
+
+@figures.chart(lambda fig, data: figures.discrete_bars(fig, data['property_type'], data['price']))
+def city_price_figure(data):
+    fig = px.bar(data, x='property_type', y='price', color='property_type',
+                 labels={'price': 'Average Price ($)', 'property_type': 'Property Type'})
+    fig.update_layout(height=530, margin=dict(l=5, r=5, t=5, b=5), showlegend=False)
+    fig.update_xaxes(tickangle=-45)
+    return fig
+
+@figures.chart(lambda fig, data: figures.discrete_scatter(fig, data['property_type'], data['property_size_sqft'],
+                                                          data['price'], data['price'], size_max=70))
+def size_price_figure(data):
+    fig = px.scatter(data, x='property_size_sqft', y='price', size='price', color='property_type', 
+                     text='property_type', size_max=70,
+                     labels={'price': 'Avg Price ($)', 'property_size_sqft': 'Size (sqft)', 'property_type': 'Type'})
+    fig.update_traces(textposition='top center')
+    fig.update_layout(height=600, margin=dict(l=5, r=5, t=60, b=5),
+                      legend=dict(orientation="h", yanchor="top", y=1.12, xanchor="center", x=0.5))
+    return fig
+
+@figures.chart(lambda fig, data, metric: figures.discrete_bars(fig, data['property_type'], data[metric]))
+def type_metric_figure(data, metric):
+    fig = px.bar(data, x='property_type', y=metric, color='property_type',
+                 labels={metric: 'Amount ($)', 'property_type': 'Type'})
+    fig.update_layout(height=600, margin=dict(l=5, r=5, t=60, b=5),
+                      legend=dict(orientation="h", yanchor="top", y=1.12, xanchor="center", x=0.5))
+    fig.update_xaxes(tickangle=-45)
+    return fig
+
+def largest_slice_pull(data):
+    return [0.05 if i == 0 else 0 for i in range(len(data))]  # Pull out the largest slice
+
+@figures.chart(lambda fig, data, palette, title: figures.donut(fig, data['property_type'], data['price'],
+                                                               title, largest_slice_pull(data)))
+def price_donut_figure(data, palette, *, title):
+    fig = px.pie(data, values='price', names='property_type', 
+                 title=title,
+                 labels={'property_type': 'Property Type', 'price': 'Avg Price'},
+                 hole=0.4,  # Makes it a donut chart
+                 color_discrete_sequence=getattr(px.colors.qualitative, palette))
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        hovertemplate='<b>%{label}</b><br>Avg Price: $%{value:,.0f}<br>Percentage: %{percent}<extra></extra>',
+        pull=largest_slice_pull(data)
+    )
+    fig.update_layout(
+        height=530, 
+        margin=dict(l=5, r=5, t=60, b=5),
+        showlegend=True,
+        legend=dict(
+            orientation="v",
+            yanchor="middle",
+            y=0.5,
+            xanchor="left",
+            x=1.05
+        )
+    )
+    return fig
+
+# Callbacks
+@callback(Output('page-content', 'children'), Input('url', 'pathname'))
+def display_page(pathname):
+    return countrywise_layout if pathname == '/country-wise' else dashboard_layout
+
+# The countries come from the live snapshot, so ones added by ingestion are offered too.
+@callback(Output('country-dropdown-main', 'options'), Input('country-dropdown-main', 'id'))
+def populate_countries(_):
+    return [{'label': c, 'value': c} for c in filter_options('country')]
+
+@callback(Output('chart1-dashboard', 'figure'), Input('chart1-dashboard', 'id'))
+@cache_figure
+def update_dashboard_chart1(_):
+    return price_map_figure(country_means(['price_per_sqft']))
+
+@callback(Output('chart2-dashboard', 'figure'), Input('chart2-dashboard', 'id'))
+@cache_figure
+def update_dashboard_chart2(_):
+    with stage('aggregate'):
+        heatmap_pivot = current().cube['country_types'].unstack('property_type').fillna(0)
+    return type_heatmap_figure(heatmap_pivot)
+
+@callback(Output('chart3-dashboard', 'figure'), Input('metric-dropdown-dashboard', 'value'))
+@memoize
+def update_dashboard_chart3(metric):
+    return country_metric_figure(country_means([metric]).sort_values(metric, ascending=False), metric)
+
+@callback(Output('chart4-dashboard', 'figure'), Input('chart4-dashboard', 'id'))
+@cache_figure
+def update_dashboard_chart4(_):
+    if BOX_SUMMARY:
+        fig = summary_box_figure('country', 'customer_salary')
+    else:
+        fig = px.box(current().source.df, x='country', y='customer_salary', color='country')
+    fig.update_layout(height=470, margin=dict(l=5, r=5, t=5, b=5), showlegend=False)
+    fig.update_xaxes(tickangle=-45)
+    return fig
+
+@callback(Output('chart5-dashboard', 'figure'), Input('chart5-dashboard', 'id'))
+@cache_figure
+def update_dashboard_chart5(_):
+    data = country_means(['customer_salary', 'loan_amount'])
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=data['country'], y=data['customer_salary'], name='Avg Salary', marker_color='#3498db'))
+    fig.add_trace(go.Bar(x=data['country'], y=data['loan_amount'], name='Avg Loan', marker_color='#e74c3c'))
+    fig.update_layout(height=470, margin=dict(l=5, r=5, t=5, b=5), barmode='group',
+                      legend=dict(orientation="h", yanchor="top", y=1.1, xanchor="center", x=0.5))
+    fig.update_xaxes(tickangle=-45)
+    return fig
+
+def populate_cities(country):
+    if not country: return [], None
+    cities = filter_options('city', ('country', country))
+    return [{'label': c, 'value': c} for c in cities], cities[0] if cities else None
+
+@memoize
+def update_country_chart1(country, city):
+    if not country or not city: return figures.blank('bar', 530)
+    data = cube_means('city', (country, city), ['price'])
+    if data is None: return figures.blank('bar', 530)
+    return city_price_figure(data.sort_values('price', ascending=False))
+
+def populate_furnishing(country, city):
+    if not country or not city: return [], None
+    furn = filter_options('furnishing_status', ('country', country), ('city', city))
+    return [{'label': f, 'value': f} for f in furn], furn[0] if furn else None
+
+@memoize
+def update_country_chart2(country, city, furnishing):
+    if not all([country, city, furnishing]): return figures.blank('scatter', 600)
+    data = cube_means('furnishing', (country, city, furnishing), ['price', 'property_size_sqft'])
+    if data is None: return figures.blank('scatter', 600)
+    return size_price_figure(data)
+
+@memoize
+def update_country_chart3(country, city, furnishing, metric):
+    if not all([country, city, furnishing]): return figures.blank('bar', 600)
+    data = cube_means('furnishing', (country, city, furnishing), [metric])
+    if data is None: return figures.blank('bar', 600)
+    return type_metric_figure(data.sort_values(metric, ascending=False), metric)
+
+def populate_rooms(country, city, furnishing):
+    if not all([country, city, furnishing]): return [], None
+    rooms = filter_options('rooms', ('country', country), ('city', city), ('furnishing_status', furnishing))
+    return [{'label': f'{r} Rooms', 'value': r} for r in rooms], rooms[0] if rooms else None
+
+@memoize
+def update_country_chart4(country, city, furnishing, rooms):
+    if not all([country, city, furnishing, rooms]): 
+        return figures.blank('pie', 530, 'Select all filters')
+    data = cube_means('rooms', (country, city, furnishing, rooms), ['price'])
+    if data is None: 
+        return figures.blank('pie', 530, 'No data available')
+    return price_donut_figure(data.sort_values('price', ascending=False), 'Set3',
+                              title=f'Price Distribution by Property Type<br>{rooms} Rooms in {city}')
+
+def populate_connectivity(country, city):
+    if not country or not city: return [], None
+    conn = filter_options('connectivity_score', ('country', country), ('city', city))
+    return [{'label': f'Score {c}', 'value': c} for c in conn], conn[0] if conn else None
+
+@memoize
+def update_country_chart5(country, city, connectivity):
+    if not all([country, city, connectivity]): 
+        return figures.blank('pie', 530, 'Select all filters')
+    data = cube_means('connectivity', (country, city, connectivity), ['price'])
+    if data is None: 
+        return figures.blank('pie', 530, 'No data available')
+    return price_donut_figure(data.sort_values('price', ascending=False), 'Pastel',
+                              title=f'Price Distribution by Property Type<br>Connectivity Score: {connectivity} in {city}')
+
+# One request per country-page interaction: the dropdown cascade is resolved once and
+# only the charts that depend on the changed filter are redrawn, instead of a chain of
+# per-chart callbacks each re-deriving the same selection in its own round trip.
+if not CLIENTSIDE_CHARTS:
+    @callback(Output('city-dropdown-country', 'options'), Output('city-dropdown-country', 'value'),
+              Output('furnishing-dropdown-country', 'options'), Output('furnishing-dropdown-country', 'value'),
+              Output('rooms-dropdown-country', 'options'), Output('rooms-dropdown-country', 'value'),
+              Output('connectivity-dropdown-country', 'options'), Output('connectivity-dropdown-country', 'value'),
+              Output('chart1-country', 'figure'), Output('chart2-country', 'figure'), Output('chart3-country', 'figure'),
+              Output('chart4-country', 'figure'), Output('chart5-country', 'figure'),
+              Input('country-dropdown-main', 'value'), Input('city-dropdown-country', 'value'),
+              Input('furnishing-dropdown-country', 'value'), Input('rooms-dropdown-country', 'value'),
+              Input('connectivity-dropdown-country', 'value'), Input('financial-metric-dropdown-country', 'value'))
+    def update_country_page(country, city, furnishing, rooms, connectivity, metric):
+        trigger = dash.ctx.triggered_id  # None on the initial call, which renders everything
+        new_country = trigger in (None, 'country-dropdown-main')
+        new_city = new_country or trigger == 'city-dropdown-country'
+        new_furnishing = new_city or trigger == 'furnishing-dropdown-country'
+        new_rooms = new_furnishing or trigger == 'rooms-dropdown-country'
+        new_connectivity = new_city or trigger == 'connectivity-dropdown-country'
+        new_metric = new_furnishing or trigger == 'financial-metric-dropdown-country'
+
+        skip = dash.no_update
+        cities = furnishings = room_counts = scores = (skip, skip)
+        if new_country:
+            cities = populate_cities(country)
+            city = cities[1]
+        if new_city:
+            furnishings, scores = populate_furnishing(country, city), populate_connectivity(country, city)
+            furnishing, connectivity = furnishings[1], scores[1]
+        if new_furnishing:
+            room_counts = populate_rooms(country, city, furnishing)
+            rooms = room_counts[1]
+        return (*cities, *furnishings, *room_counts, *scores,
+                update_country_chart1(country, city) if new_city else skip,
+                update_country_chart2(country, city, furnishing) if new_furnishing else skip,
+                update_country_chart3(country, city, furnishing, metric) if new_metric else skip,
+                update_country_chart4(country, city, furnishing, rooms) if new_rooms else skip,
+                update_country_chart5(country, city, connectivity) if new_connectivity else skip)
+
+# Client-side rendering
+# The browser regroups the city's aggregate table itself and fills skeletons taken from
+# the server-rendered figures (same layout, trace styling and colorway), so both modes
+# draw identical charts.
+CLIENT_MEASURES = {
+    'city': ['price'],
+    'furnishing': ['price', 'property_size_sqft', 'customer_salary', 'down_payment', 'loan_amount'],
+    'rooms': ['price'],
+    'connectivity': ['price'],
+}
+
+def city_aggregates(country, city):
+    """Per-property_type means of every country-page view for one city, as columns."""
+    node = filter_node(('country', country), ('city', city))
+    if node is None: return None
+    furnishings = list(node['children'].get('furnishing_status', {}))
+    selections = {
+        'city': [()],
+        'furnishing': [(f,) for f in furnishings],
+        'rooms': [(f, r) for f in furnishings
+                  for r in node['children']['furnishing_status'][f]['children'].get('rooms', {})],
+        'connectivity': [(c,) for c in node['children'].get('connectivity_score', {})],
+    }
+    table = {'country_name': country, 'city_name': city}
+    for view, extras in selections.items():
+        names = CUBE_VIEWS[view][2:] + ['property_type'] + CLIENT_MEASURES[view]
+        columns = {name: [] for name in names}
+        for extra in extras:
+            means = current().cube['views'][view][(country, city, *extra)]['mean']
+            for name, value in zip(CUBE_VIEWS[view][2:], extra):
+                columns[name] += [value] * len(means)
+            columns['property_type'] += means.index.tolist()
+            for measure in CLIENT_MEASURES[view]:
+                columns[measure] += means[measure].tolist()
+        table[view] = columns
+    return table
+
+def country_chart_skeletons():
+    """Layouts and first traces of the server-rendered country charts, for the browser.
+
+    The *_empty and *_nodata entries are complete figures; the others are filled with data.
+    """
+    country = filter_options('country')[0]
+    city = filter_options('city', ('country', country))[0]
+    path = (('country', country), ('city', city))
+    furnishing = filter_options('furnishing_status', *path)[0]
+    rooms = filter_options('rooms', *path, ('furnishing_status', furnishing))[0]
+    connectivity = filter_options('connectivity_score', *path)[0]
+    figures = {
+        'chart1': update_country_chart1(country, city),
+        'chart2': update_country_chart2(country, city, furnishing),
+        'chart3': update_country_chart3(country, city, furnishing, 'customer_salary'),
+        'chart4': update_country_chart4(country, city, furnishing, rooms),
+        'chart5': update_country_chart5(country, city, connectivity),
+        'chart1_empty': update_country_chart1(None, None),
+        'chart2_empty': update_country_chart2(None, None, None),
+        'chart3_empty': update_country_chart3(None, None, None, None),
+        'chart4_empty': update_country_chart4(None, None, None, None),
+        'chart5_empty': update_country_chart5(None, None, None),
+        'chart4_nodata': update_country_chart4(country, city, furnishing, -1),
+        'chart5_nodata': update_country_chart5(country, city, -1),
+    }
+    template = figures['chart1']['layout']['template']
+    skeletons = {'template': template, 'colorway': template['layout']['colorway']}
+    for name, fig in figures.items():
+        layout = {key: value for key, value in fig['layout'].items() if key != 'template'}
+        skeletons[name] = {'layout': layout, 'data': fig['data'][:1]}
+    return skeletons
+
+if CLIENTSIDE_CHARTS:
+    @callback(Output('city-dropdown-country', 'options'), Output('city-dropdown-country', 'value'),
+              Output('city-aggregates', 'data'),
+              Input('country-dropdown-main', 'value'), Input('city-dropdown-country', 'value'))
+    def update_city_aggregates(country, city):
+        cities = (dash.no_update, dash.no_update)
+        if dash.ctx.triggered_id in (None, 'country-dropdown-main'):
+            cities = populate_cities(country)
+            city = cities[1]
+        return *cities, city_aggregates(country, city)
+
+    app.clientside_callback(
+        dash.ClientsideFunction(namespace='countryCharts', function_name='render'),
+        Output('furnishing-dropdown-country', 'options'), Output('furnishing-dropdown-country', 'value'),
+        Output('rooms-dropdown-country', 'options'), Output('rooms-dropdown-country', 'value'),
+        Output('connectivity-dropdown-country', 'options'), Output('connectivity-dropdown-country', 'value'),
+        Output('chart1-country', 'figure'), Output('chart2-country', 'figure'), Output('chart3-country', 'figure'),
+        Output('chart4-country', 'figure'), Output('chart5-country', 'figure'),
+        Input('city-aggregates', 'data'), Input('furnishing-dropdown-country', 'value'),
+        Input('rooms-dropdown-country', 'value'), Input('connectivity-dropdown-country', 'value'),
+        Input('financial-metric-dropdown-country', 'value'), State('country-chart-skeletons', 'data'))
+
+def warm_figure_cache():
+    """Build every data-only dashboard figure up front so page loads are memory reads."""
+    update_dashboard_chart1('chart1-dashboard')
+    update_dashboard_chart2('chart2-dashboard')
+    update_dashboard_chart4('chart4-dashboard')
+    update_dashboard_chart5('chart5-dashboard')
+    for option in metric_dropdown_dashboard.options:
+        update_dashboard_chart3(option['value'])
+
+warm_figure_cache()
+if INGEST_DIR:
+    drop_directory = ingestion.DropDirectory(INGEST_DIR, lambda name, batch: ingest(batch, name))
+    drop_directory.poll()
+    ingestion.register(server, drop_directory, check_batch, os.environ.get('DASH_INGEST_TOKEN'))
+if CLIENTSIDE_CHARTS:
+    country_skeletons_store.data = country_chart_skeletons()
+
+if __name__ == '__main__':
     app.run_server(debug=False, host='0.0.0.0', port=8050)
\ No newline at end of file
@@ -0,0 +1,148 @@
+// Client-side rendering of the country page (DASH_CLIENTSIDE_CHARTS=1).
+// `table` is the city's aggregate table from city_aggregates() in app.py and `sk` the
+// figure skeletons from country_chart_skeletons(); every chart here mirrors the
+// server-rendered figure of the same name.
+(function () {
+    function clone(value) {
+        return JSON.parse(JSON.stringify(value));
+    }
+
+    function figure(sk, name, data) {
+        var layout = clone(sk[name].layout);
+        layout.template = sk.template;
+        return {data: data || clone(sk[name].data), layout: layout};
+    }
+
+    function rowsWhere(view, column, value) {
+        var rows = [];
+        view.property_type.forEach(function (_, i) {
+            if (column === null || view[column][i] === value) rows.push(i);
+        });
+        return rows;
+    }
+
+    function distinct(values) {
+        return values.filter(function (value, i) { return values.indexOf(value) === i; });
+    }
+
+    function dropdown(values, label) {
+        return [values.map(function (v) { return {label: label(v), value: v}; }),
+                values.length ? values[0] : null];
+    }
+
+    function byValueDescending(view, measure, rows) {
+        return rows.slice().sort(function (a, b) { return view[measure][b] - view[measure][a]; });
+    }
+
+    function bars(sk, name, view, measure, rows) {
+        var order = byValueDescending(view, measure, rows);
+        var data = order.map(function (i, n) {
+            var trace = clone(sk[name].data[0]);
+            trace.name = trace.legendgroup = view.property_type[i];
+            trace.marker.color = sk.colorway[n % sk.colorway.length];
+            trace.x = [view.property_type[i]];
+            trace.y = [view[measure][i]];
+            return trace;
+        });
+        var fig = figure(sk, name, data);
+        fig.layout.xaxis.categoryarray = order.map(function (i) { return view.property_type[i]; });
+        return fig;
+    }
+
+    function donut(sk, name, view, rows, title) {
+        var order = byValueDescending(view, 'price', rows);
+        var trace = clone(sk[name].data[0]);
+        trace.labels = order.map(function (i) { return view.property_type[i]; });
+        trace.values = order.map(function (i) { return view.price[i]; });
+        trace.pull = order.map(function (_, n) { return n === 0 ? 0.05 : 0; });
+        var fig = figure(sk, name, [trace]);
+        fig.layout.title.text = title;
+        return fig;
+    }
+
+    function chart1(sk, table) {
+        if (!table) return figure(sk, 'chart1_empty');
+        return bars(sk, 'chart1', table.city, 'price', rowsWhere(table.city, null));
+    }
+
+    function chart2(sk, table, furnishing) {
+        var view = table && table.furnishing;
+        var rows = furnishing ? rowsWhere(view, 'furnishing_status', furnishing) : [];
+        if (!rows.length) return figure(sk, 'chart2_empty');
+        var sizeref = Math.max.apply(null, rows.map(function (i) { return view.price[i]; })) / (70 * 70);
+        return figure(sk, 'chart2', rows.map(function (i, n) {
+            var trace = clone(sk.chart2.data[0]);
+            trace.name = trace.legendgroup = view.property_type[i];
+            trace.text = [view.property_type[i]];
+            trace.marker.color = sk.colorway[n % sk.colorway.length];
+            trace.marker.size = [view.price[i]];
+            trace.marker.sizeref = sizeref;
+            trace.x = [view.property_size_sqft[i]];
+            trace.y = [view.price[i]];
+            return trace;
+        }));
+    }
+
+    function chart3(sk, table, furnishing, metric) {
+        var rows = table && furnishing ? rowsWhere(table.furnishing, 'furnishing_status', furnishing) : [];
+        if (!rows.length) return figure(sk, 'chart3_empty');
+        return bars(sk, 'chart3', table.furnishing, metric, rows);
+    }
+
+    function chart4(sk, table, furnishing, rooms) {
+        if (!table || !furnishing || !rooms) return figure(sk, 'chart4_empty');
+        var rows = rowsWhere(table.rooms, 'furnishing_status', furnishing).filter(function (i) {
+            return table.rooms.rooms[i] === rooms;
+        });
+        if (!rows.length) return figure(sk, 'chart4_nodata');
+        return donut(sk, 'chart4', table.rooms, rows,
+                     'Price Distribution by Property Type<br>' + rooms + ' Rooms in ' + table.city_name);
+    }
+
+    function chart5(sk, table, connectivity) {
+        if (!table || !connectivity) return figure(sk, 'chart5_empty');
+        var rows = rowsWhere(table.connectivity, 'connectivity_score', connectivity);
+        if (!rows.length) return figure(sk, 'chart5_nodata');
+        return donut(sk, 'chart5', table.connectivity, rows,
+                     'Price Distribution by Property Type<br>Connectivity Score: ' + connectivity +
+                     ' in ' + table.city_name);
+    }
+
+    function render(table, furnishing, rooms, connectivity, metric, sk) {
+        var skip = window.dash_clientside.no_update;
+        var triggered = window.dash_clientside.callback_context.triggered || [];
+        var trigger = triggered.length === 1 ? triggered[0].prop_id.split('.')[0] : null;
+        var newCity = trigger === null || trigger === 'city-aggregates';
+        var newFurnishing = newCity || trigger === 'furnishing-dropdown-country';
+        var newRooms = newFurnishing || trigger === 'rooms-dropdown-country';
+        var newConnectivity = newCity || trigger === 'connectivity-dropdown-country';
+        var newMetric = newFurnishing || trigger === 'financial-metric-dropdown-country';
+
+        var furnishings = [skip, skip], roomCounts = [skip, skip], scores = [skip, skip];
+        if (newCity) {
+            furnishings = dropdown(table ? distinct(table.furnishing.furnishing_status) : [],
+                                   function (f) { return f; });
+            scores = dropdown(table ? distinct(table.connectivity.connectivity_score) : [],
+                              function (c) { return 'Score ' + c; });
+            furnishing = furnishings[1];
+            connectivity = scores[1];
+        }
+        if (newFurnishing) {
+            var rows = table && furnishing ? rowsWhere(table.rooms, 'furnishing_status', furnishing) : [];
+            roomCounts = dropdown(distinct(rows.map(function (i) { return table.rooms.rooms[i]; })),
+                                  function (r) { return r + ' Rooms'; });
+            rooms = roomCounts[1];
+        }
+        return furnishings.concat(roomCounts, scores, [
+            newCity ? chart1(sk, table) : skip,
+            newFurnishing ? chart2(sk, table, furnishing) : skip,
+            newMetric ? chart3(sk, table, furnishing, metric) : skip,
+            newRooms ? chart4(sk, table, furnishing, rooms) : skip,
+            newConnectivity ? chart5(sk, table, connectivity) : skip,
+        ]);
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        countryCharts: {render: render},
+    });
+})();
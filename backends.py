@@ -0,0 +1,237 @@
+"""Where the purchase rows live, and the row-level queries the dashboard runs on them.
+
+DASH_DATA_BACKEND picks the implementation:
+
+    pandas   (default) the whole dataset in one frame per process, memory-mapped from
+             the binary cache with DASH_SHARED_DATA=1
+    parquet  Parquet files partitioned by country under DASH_PARQUET_DIR, scanned by an
+             embedded DuckDB (optional: pip install duckdb). Filters and group-bys run
+             inside the scan, which spills to disk past DASH_DUCKDB_MEMORY, so memory is
+             bounded by the size of the results rather than of the dataset.
+
+Both describe their stored columns (columns, and the numeric ones in numeric) and
+answer the same questions: sums and counts of measures grouped by some columns
+(aggregate), box-plot statistics per group (box_summaries), and a copy with a batch
+of rows appended (append). The callbacks only read what is derived from those. To
+convert a CSV, streaming it through DuckDB without loading it into memory:
+
+    python backends.py build [csv] [directory]
+"""
+import functools
+import glob
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from dataset import DATA_PATH
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+PARQUET_DIR = os.environ.get('DASH_PARQUET_DIR', 'global_house_purchase_dataset.parquet')
+NUMERIC_TYPES = {'TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT', 'UINTEGER',
+                 'UBIGINT', 'FLOAT', 'DOUBLE', 'DECIMAL', 'BOOLEAN'}
+
+
+def with_derived(data, derived):
+    """data with each derived column computed from its expression, e.g. 'price / property_size_sqft'."""
+    return data.assign(**{name: data.eval(expr) for name, expr in derived.items()})
+
+
+def aggregate_frame(data, dims, measures):
+    """Sums and counts of measures, and row counts, of data grouped by dims."""
+    grouped = data.groupby(dims, observed=True)
+    base = grouped[measures].agg(['sum', 'count'])
+    base.columns = base.columns.swaplevel()
+    rows = grouped.size()
+    # Plain (not categorical) index levels, so aggregates of different batches align.
+    levels = [level.astype(level.dtype.categories.dtype) if isinstance(level.dtype, pd.CategoricalDtype) else level
+              for level in base.index.levels]
+    base.index = rows.index = base.index.set_levels(levels)
+    return base, rows
+
+
+def box_summary(values, cap):
+    """Quartiles, whisker fences and at most cap evenly spaced outliers of values."""
+    values = np.sort(values[~np.isnan(values)])
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    reach = 1.5 * (q3 - q1)
+    inside = values[(values >= q1 - reach) & (values <= q3 + reach)]
+    outliers = values[(values < inside[0]) | (values > inside[-1])]
+    if len(outliers) > cap:
+        outliers = outliers[np.linspace(0, len(outliers) - 1, cap).astype(int)]
+    return {'q1': q1, 'median': median, 'q3': q3,
+            'lowerfence': inside[0], 'upperfence': inside[-1], 'outliers': outliers}
+
+
+class PandasBackend:
+    """Rows in df, which already holds the derived columns."""
+
+    def __init__(self, df, derived, version=None, batches=frozenset()):
+        self.df, self.derived, self.version, self.batches = df, derived, version, batches
+        self.columns = [col for col in df.columns if col not in derived]
+        self.numeric = {col for col in self.columns if pd.api.types.is_numeric_dtype(df[col])}
+
+    def aggregate(self, dims, measures):
+        return aggregate_frame(self.df, dims, measures)
+
+    def box_summaries(self, x, y, cap):
+        return {group: box_summary(values.to_numpy(dtype=float), cap)
+                for group, values in self.df.groupby(x, observed=True)[y]}
+
+    def append(self, batch, name):
+        """(backend with batch appended, the appended rows), or None when a batch of that name
+        is already in this backend. Categoricals are re-coded over the union of their categories."""
+        if name in self.batches: return None
+        batch = with_derived(batch[self.columns], self.derived)
+        old, new = {}, {}
+        for col in self.df.columns:
+            if isinstance(self.df[col].dtype, pd.CategoricalDtype):
+                categories = self.df[col].cat.categories.union(pd.Index(batch[col].dropna().unique().tolist()))
+                old[col] = self.df[col].cat.set_categories(categories)
+                new[col] = pd.Categorical(batch[col], categories=categories)
+        df = pd.concat([self.df.assign(**old), batch.assign(**new)], ignore_index=True)
+        return PandasBackend(df, self.derived, batches=self.batches | {name}), df.iloc[len(self.df):]
+
+
+def partition_value(value):
+    """value as the name of a country=<value> directory; ValueError for one that could
+    name a different directory."""
+    text = str(value)
+    if not text or text in ('.', '..') or any(c in text for c in ('/', '\\', '\0', os.sep)):
+        raise ValueError(f"not a valid partition value: {text!r}")
+    return text
+
+
+class ParquetBackend:
+    """country=<name>/*.parquet files under directory. The file list is fixed per instance,
+    so a snapshot keeps reading the same rows while appends create new instances."""
+
+    def __init__(self, directory, derived, files=None):
+        if duckdb is None:
+            raise RuntimeError("DASH_DATA_BACKEND=parquet needs duckdb: pip install duckdb")
+        self.directory, self.derived = directory, derived
+        self.files = files or sorted(glob.glob(os.path.join(directory, 'country=*', '*.parquet')))
+        if not self.files:
+            raise FileNotFoundError(f"no Parquet partitions under {directory}; run: python backends.py build")
+        self._local = threading.local()
+        described = self._query(f'DESCRIBE SELECT * FROM {self._scan()}').fetchall()
+        self.columns = [name for name, *_ in described]
+        self.numeric = {name for name, kind, *_ in described if kind.split('(')[0] in NUMERIC_TYPES}
+
+    @functools.cached_property
+    def version(self):
+        # Named by content, so a copied or redeployed directory keeps its version. Only
+        # load_data asks; appended instances are versioned by the snapshot instead.
+        digest = hashlib.sha1()
+        for path in self.files:
+            digest.update(os.path.relpath(path, self.directory).encode())
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()[:16]
+
+    def _connect(self):
+        # One connection per thread, and never one inherited across a fork.
+        if getattr(self._local, 'pid', None) != os.getpid():
+            db = duckdb.connect()
+            db.execute(f"SET memory_limit = '{os.environ.get('DASH_DUCKDB_MEMORY', '1GB')}'")
+            self._local.db, self._local.pid = db, os.getpid()
+        return self._local.db
+
+    def _query(self, sql, params=None):
+        return self._connect().execute(sql, [self.files] + (params or []))
+
+    def _scan(self):
+        return 'read_parquet(?, hive_partitioning = true, union_by_name = true)'
+
+    def _rows(self):
+        derived = ''.join(f', {expr} AS "{name}"' for name, expr in self.derived.items())
+        return f'(SELECT *{derived} FROM {self._scan()})'
+
+    def aggregate(self, dims, measures):
+        keys = ', '.join(f'"{dim}"' for dim in dims)
+        stats = ', '.join(f'COALESCE(SUM("{m}"), 0)::DOUBLE AS "sum|{m}", COUNT("{m}") AS "count|{m}"' for m in measures)
+        present = ' AND '.join(f'"{dim}" IS NOT NULL' for dim in dims)
+        frame = self._query(f'SELECT {keys}, {stats}, COUNT(*) AS "rows" FROM {self._rows()} '
+                            f'WHERE {present} GROUP BY {keys} ORDER BY {keys}').fetchdf().set_index(dims)
+        base = frame.drop(columns='rows')
+        base.columns = pd.MultiIndex.from_tuples([tuple(col.split('|')) for col in base.columns])
+        return base, frame['rows']
+
+    def box_summaries(self, x, y, cap):
+        """box_summary per group of x in three streaming passes over the scan (quartiles,
+        whisker ends, then outliers thinned to cap per group); only the outliers are sorted."""
+        values = f'(SELECT "{x}" AS g, "{y}"::DOUBLE AS y FROM {self._rows()} WHERE NOT isnan("{y}"::DOUBLE))'
+        quartiles = self._query(f'SELECT g, quantile_cont(y, [0.25, 0.5, 0.75]) FROM {values} GROUP BY g ORDER BY g').fetchall()
+        bounds = [(g, q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)) for g, (q1, _, q3) in quartiles]
+        groups = f"(VALUES {', '.join(['(?, ?::DOUBLE, ?::DOUBLE)'] * len(bounds))}) b(g, lo, hi)"
+        params = [value for bound in bounds for value in bound]
+        fences = {g: (lower, upper) for g, lower, upper in self._query(
+            f'SELECT v.g, MIN(y), MAX(y) FROM {values} v JOIN {groups} ON v.g = b.g '
+            f'WHERE y BETWEEN lo AND hi GROUP BY v.g', params).fetchall()}
+        outliers = self._query(f'''
+            SELECT g, y FROM (
+                SELECT v.g, y, row_number() OVER (PARTITION BY v.g ORDER BY y) - 1 AS i, count(*) OVER (PARTITION BY v.g) AS n
+                FROM {values} v JOIN {groups} ON v.g = b.g WHERE y < lo OR y > hi)
+            WHERE n <= {cap} OR i IN (SELECT CASE WHEN k = {cap} - 1 THEN n - 1 ELSE floor(k * ((n - 1) / ({cap} - 1)))::BIGINT END
+                                      FROM range({cap}) r(k))
+            ORDER BY g, y''', params).fetchdf()
+        return {g: {'q1': q1, 'median': median, 'q3': q3, 'lowerfence': fences[g][0], 'upperfence': fences[g][1],
+                    'outliers': outliers.loc[outliers['g'] == g, 'y'].to_numpy()}
+                for g, (q1, median, q3) in quartiles}
+
+    def append(self, batch, name):
+        """(backend including batch, its rows), or None when batch is already in this backend.
+
+        Each country's rows go to country=<c>/ingest-<name>.parquet. The names are
+        deterministic, so every worker applying the same batch shares the files one of
+        them wrote, and a restarted worker, which already scans them, skips the batch.
+        """
+        stem = f"ingest-{os.path.splitext(name or uuid.uuid4().hex)[0]}"
+        batch = batch[[col for col in self.columns if col in batch]]
+        files = []
+        for country, rows in batch.groupby('country', observed=True):
+            path = os.path.join(self.directory, f'country={partition_value(country)}', f'{stem}.parquet')
+            if path in self.files: return None
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f'{path}.{os.getpid()}.tmp'
+                rows = rows.drop(columns='country')
+                rows = rows.astype({col: object for col in rows.columns if isinstance(rows[col].dtype, pd.CategoricalDtype)})
+                self._connect().from_df(rows).write_parquet(tmp)  # no SQL text built from the data
+                os.replace(tmp, path)
+            files.append(path)
+        return ParquetBackend(self.directory, self.derived, sorted(self.files + files)), with_derived(batch, self.derived)
+
+
+def build_parquet(source, directory):
+    """Partition the CSV at source by country into directory, replacing what was there."""
+    if duckdb is None:
+        sys.exit("building Parquet partitions needs duckdb: pip install duckdb")
+    tmp = f'{directory}.tmp'
+    os.makedirs(os.path.dirname(os.path.abspath(directory)), exist_ok=True)
+    duckdb.connect().execute(f"COPY (SELECT * FROM read_csv(?)) TO '{tmp}' "
+                             f"(FORMAT parquet, PARTITION_BY (country), OVERWRITE_OR_IGNORE)", [source])
+    stale = f'{directory}.old'
+    if os.path.exists(directory):
+        os.rename(directory, stale)
+    os.rename(tmp, directory)
+    shutil.rmtree(stale, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'build':
+        sys.exit(__doc__)
+    source = sys.argv[2] if len(sys.argv) > 2 else DATA_PATH
+    directory = sys.argv[3] if len(sys.argv) > 3 else PARQUET_DIR
+    build_parquet(source, directory)
+    print(f"Partitioned {source} -> {directory}")
@@ -0,0 +1,612 @@
+"""Benchmarks for the dashboard callbacks.
+
+Run from the directory holding global_house_purchase_dataset.csv:
+
+    python benchmark.py callbacks
+    python benchmark.py memory
+    python benchmark.py startup
+    python benchmark.py workers
+    python benchmark.py payload
+    python benchmark.py interaction
+    python benchmark.py pages
+    python benchmark.py backends
+    python benchmark.py figures
+    python benchmark.py transfer
+    python benchmark.py clientside
+"""
+import argparse
+import base64
+import functools
+import gzip
+import inspect
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import dash
+import numpy as np
+import pandas as pd
+from dash import dcc, html
+from dash.dependencies import Input, Output
+from plotly.io.json import to_json_plotly
+
+import app
+import backends
+import compression
+import dataset
+import figures
+import loadtest
+import metrics
+
+
+
+def row_count():
+    """Rows in the loaded dataset, whichever backend holds them."""
+    return int(app.current().cube['rows'].sum())
+
+
+@functools.cache
+def scan_frame():
+    """The dataset as a pandas frame, for the scans the cube replaced (the parquet backend
+    keeps none in memory)."""
+    return dataset.read_dataset(app.DATA_PATH)
+
+
+def timed(fn, *args, repeat=20):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def report(title, rows):
+    print(f"\n{title}")
+    width = max(len(name) for name, *_ in rows)
+    for name, *cols in rows:
+        print(f"  {name:<{width}}  " + "  ".join(f"{c:>10.3f} ms" for c in cols))
+
+
+# Callbacks
+def sample_inputs():
+    """One representative input tuple per country-page callback."""
+    country = app.filter_options('country')[0]
+    path = (('country', country), ('city', app.filter_options('city', ('country', country))[0]))
+    city = path[1][1]
+    furnishing = app.filter_options('furnishing_status', *path)[0]
+    rooms = app.filter_options('rooms', *path, ('furnishing_status', furnishing))[0]
+    conn = app.filter_options('connectivity_score', *path)[0]
+    return {
+        'city': (country, city),
+        'furnishing': (country, city, furnishing),
+        'rooms': (country, city, furnishing, rooms),
+        'connectivity': (country, city, conn),
+    }
+
+
+def scan_means(view, key, measures):
+    """The pre-cube data path: boolean masks over the full frame, then a groupby."""
+    df, mask = scan_frame(), True
+    for col, value in zip(app.CUBE_VIEWS[view], key):
+        mask = mask & (df[col] == value)
+    filtered = df[mask]
+    return filtered.groupby('property_type')[measures].mean().reset_index()
+
+
+def bench_callbacks(args):
+    inputs = sample_inputs()
+    lookups = [
+        ('update_country_chart1', 'city', ['price']),
+        ('update_country_chart2', 'furnishing', ['price', 'property_size_sqft']),
+        ('update_country_chart3', 'furnishing', ['customer_salary']),
+        ('update_country_chart4', 'rooms', ['price']),
+        ('update_country_chart5', 'connectivity', ['price']),
+    ]
+    rows = []
+    for name, view, measures in lookups:
+        key = inputs[view]
+        rows.append((name, timed(scan_means, view, key, measures, repeat=args.repeat),
+                     timed(app.cube_means, view, key, measures, repeat=args.repeat)))
+    print(f"rows: {row_count():,}")
+    report("data access per callback (scan | cube)", rows)
+
+    country, city, furnishing, rooms = inputs['rooms']
+    conn = inputs['connectivity'][2]
+    calls = [
+        ('populate_cities', (country,)),
+        ('populate_furnishing', (country, city)),
+        ('populate_rooms', (country, city, furnishing)),
+        ('populate_connectivity', (country, city)),
+        ('update_country_chart1', (country, city)),
+        ('update_country_chart2', (country, city, furnishing)),
+        ('update_country_chart3', (country, city, furnishing, 'customer_salary')),
+        ('update_country_chart4', (country, city, furnishing, rooms)),
+        ('update_country_chart5', (country, city, conn)),
+    ]
+    report("end-to-end callback latency", [
+        (name, timed(getattr(app, name), *call_args, repeat=args.repeat))
+        for name, call_args in calls
+    ])
+
+
+# Memory
+def bench_memory(args):
+    raw = pd.read_csv(app.DATA_PATH)
+    compact = dataset.read_csv(app.DATA_PATH)
+    raw_bytes, compact_bytes = dataset.memory_footprint(raw), dataset.memory_footprint(compact)
+    print(f"\nper-column footprint (MB): {'default':>10}  {'schema':>10}")
+    for col in raw.columns:
+        print(f"  {col:<24} {raw_bytes[col] / 1e6:>10.2f}  {compact_bytes[col] / 1e6:>10.2f}  {compact[col].dtype}")
+    print(f"  {'total':<24} {raw_bytes.sum() / 1e6:>10.2f}  {compact_bytes.sum() / 1e6:>10.2f}"
+          f"  ({raw_bytes.sum() / compact_bytes.sum():.1f}x smaller)")
+
+
+# Startup
+def bench_startup(args):
+    path = app.DATA_PATH
+    if not dataset.cache_is_fresh(path):
+        dataset.write_cache(dataset.read_csv(path), path)
+    report("dataset load at startup", [
+        ('csv parse', timed(dataset.read_csv, path, repeat=args.repeat)),
+        ('binary cache', timed(dataset.read_dataset, path, repeat=args.repeat)),
+    ])
+
+
+# Workers
+def process_tree(root):
+    pids = [root]
+    for entry in os.listdir('/proc'):
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if ppid == root: pids.append(int(entry))
+    return pids
+
+
+def pss_mb(pid):
+    """Proportional set size: shared pages are split between the processes mapping them."""
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'): return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def serve_and_measure(workers, shared, preload, port):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), BIND=f'127.0.0.1:{port}',
+               DASH_SHARED_DATA='1' if shared else '0', DASH_PRELOAD='1' if preload else '0')
+    # The repo's gunicorn.conf.py (preload, BIND, WEB_CONCURRENCY), wherever the data is.
+    config = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', config, 'app:server'], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 300
+        while len(process_tree(proc.pid)) < workers + 1 or not _responds(port):
+            if time.time() > deadline or proc.poll() is not None:
+                raise RuntimeError(f'gunicorn with {workers} workers did not start')
+            time.sleep(0.5)
+        for _ in range(workers * 4):
+            _responds(port)
+        return sum(pss_mb(pid) for pid in process_tree(proc.pid))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def _responds(port):
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=5) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+# Each extra worker with gunicorn.conf.py's defaults (mapped data, preloaded master) must
+# cost well under the first one, and clearly less than one that loads a private frame
+# itself (DASH_SHARED_DATA=0 DASH_PRELOAD=0, how workers ran before).
+SHARED_WORKER_MAX_FRACTION = 0.5
+SHARED_VS_PRIVATE_MAX_RATIO = 0.75
+
+def bench_workers(args):
+    counts = [1, 2, 4, 8]
+    base, per_worker = {}, {}
+    for shared in (False, True):
+        totals = [serve_and_measure(n, shared, shared, args.port) for n in counts]
+        base[shared], per_worker[shared] = totals[0], (totals[-1] - totals[0]) / (counts[-1] - 1)
+        print(f"\ntotal PSS, DASH_SHARED_DATA={int(shared)} DASH_PRELOAD={int(shared)}")
+        for n, total in zip(counts, totals):
+            print(f"  {n} workers  {total:>8.1f} MB  ({(total - totals[0]) / max(n - 1, 1):>6.1f} MB per extra worker)")
+    failures = []
+    if per_worker[True] > SHARED_WORKER_MAX_FRACTION * base[True]:
+        failures.append(f"{per_worker[True]:.1f} MB per extra shared worker is over "
+                        f"{SHARED_WORKER_MAX_FRACTION:.0%} of the {base[True]:.1f} MB single-worker base")
+    if per_worker[True] > SHARED_VS_PRIVATE_MAX_RATIO * per_worker[False]:
+        failures.append(f"{per_worker[True]:.1f} MB per extra shared worker is over "
+                        f"{SHARED_VS_PRIVATE_MAX_RATIO:.0%} of the {per_worker[False]:.1f} MB of a private one")
+    if failures:
+        sys.exit("total PSS does not grow sub-linearly with workers: " + "; ".join(failures))
+
+
+# Payload
+# The summary figure holds a few numbers and at most app.BOX_OUTLIER_CAP outliers per box,
+# so its size depends on the number of groups, never on the number of rows.
+BOX_SUMMARY_MAX_KB = 16
+
+def bench_payload(args):
+    build = inspect.unwrap(app.update_dashboard_chart4)  # past the figure cache
+    sizes = {}
+    # The raw rows are only in memory with the pandas backend.
+    for summary in (False, True) if app.DATA_BACKEND == 'pandas' else (True,):
+        app.BOX_SUMMARY = summary
+        sizes[summary] = len(to_json_plotly(build('chart4-dashboard')))
+    print(f"\nupdate_dashboard_chart4 figure JSON ({row_count():,} rows)")
+    if False in sizes:
+        print(f"  raw rows       {sizes[False] / 1024:>10.1f} KB")
+    print(f"  box summary    {sizes[True] / 1024:>10.1f} KB  (limit {BOX_SUMMARY_MAX_KB} KB)")
+    if sizes[True] > BOX_SUMMARY_MAX_KB * 1024:
+        sys.exit(f"box summary figure is {sizes[True] / 1024:.1f} KB, over {BOX_SUMMARY_MAX_KB} KB")
+
+
+# Interaction
+def callback_request(output_key, values, changed):
+    """Body of the /_dash-update-component POST the browser sends for one callback."""
+    outputs = [dict(zip(('id', 'property'), out.rsplit('.', 1))) for out in output_key.strip('.').split('...')]
+    return {'output': output_key, 'outputs': outputs if len(outputs) > 1 else outputs[0],
+            'inputs': [{'id': id_, 'property': 'value', 'value': value} for id_, value in values.items()],
+            'changedPropIds': [f'{changed}.value'], 'state': []}
+
+
+def legacy_country_app():
+    """The country page served with the pre-merge chain of callbacks: one per chart or
+    dropdown, each re-deriving the selection, behind the same server hooks as app.app."""
+    legacy = dash.Dash(__name__, assets_ignore='.*')
+    legacy.layout = html.Div([dcc.Location(id='url', refresh=False), app.countrywise_layout])
+    callback = metrics.instrument(legacy)
+    compression.register(legacy.server)
+    selection = ['country-dropdown-main', 'city-dropdown-country', 'furnishing-dropdown-country']
+    chain = [
+        (app.populate_cities, ['city-dropdown-country.options', 'city-dropdown-country.value'], selection[:1]),
+        (app.update_country_chart1, ['chart1-country.figure'], selection[:2]),
+        (app.populate_furnishing, ['furnishing-dropdown-country.options', 'furnishing-dropdown-country.value'],
+         selection[:2]),
+        (app.update_country_chart2, ['chart2-country.figure'], selection),
+        (app.update_country_chart3, ['chart3-country.figure'], selection + ['financial-metric-dropdown-country']),
+        (app.populate_rooms, ['rooms-dropdown-country.options', 'rooms-dropdown-country.value'], selection),
+        (app.update_country_chart4, ['chart4-country.figure'], selection + ['rooms-dropdown-country']),
+        (app.populate_connectivity, ['connectivity-dropdown-country.options', 'connectivity-dropdown-country.value'],
+         selection[:2]),
+        (app.update_country_chart5, ['chart5-country.figure'], selection[:2] + ['connectivity-dropdown-country']),
+    ]
+    for fn, outputs, inputs in chain:
+        callback(*[Output(*out.split('.')) for out in outputs], *[Input(id_, 'value') for id_ in inputs])(fn)
+    return legacy
+
+
+def country_change(server, repeat):
+    """(POSTs, median ms) for changing the country on an open /country-wise page, with the
+    memo cleared, replayed by loadtest.Session the way the renderer fires the callbacks."""
+    client = server.test_client()
+
+    def send(method, path, body=None):
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+
+    posts = []
+    session = loadtest.Session(send, lambda kind, name, seconds, **extra: posts.append(name))
+    session.open('/country-wise')
+    countries = [option['value'] for option in session.value('country-dropdown-main', 'options')][:2]
+    times, counts = [], []
+    for i in range(repeat):
+        app.memo_store.clear()
+        posts.clear()
+        start = time.perf_counter()
+        session.change('country-dropdown-main', 'value', countries[i % 2])
+        times.append((time.perf_counter() - start) * 1000)
+        counts.append(sum(not name.startswith('GET ') for name in posts))
+    return statistics.median(counts), statistics.median(times)
+
+
+def bench_interaction(args):
+    compression.ENABLED = False  # the test client sends no Accept-Encoding; skip the ETags too
+    print("\none country change (callback POSTs, total time, both over the WSGI test client)")
+    for label, server in (('per-callback chain', legacy_country_app().server), ('merged callback', app.server)):
+        posts, ms = country_change(server, args.repeat)
+        print(f"  {label:<20} {posts:>3g} POSTs  {ms:>10.3f} ms")
+    compression.ENABLED = True
+
+
+# Pages
+# The callbacks each page load must run, once each, by their first output; anything else
+# (a hidden component's callback, the per-chart chain) is a regression.
+PAGE_CALLBACKS = {
+    '/': ['page-content.children'] + [f'chart{i}-dashboard.figure' for i in range(1, 6)],
+    '/country-wise': ['page-content.children', 'country-dropdown-main.options',
+                      # the merged country callback, or the server half of the client-side one
+                      'city-dropdown-country.options +2' if app.CLIENTSIDE_CHARTS else 'city-dropdown-country.options +12'],
+}
+
+def bench_pages(args):
+    """Callbacks each page load runs, replayed the way the renderer fires them."""
+    unexpected = []
+    for pathname, expected in PAGE_CALLBACKS.items():
+        calls = []
+        session = loadtest.Session(loadtest.wsgi_transport(), lambda kind, name, seconds, **extra: calls.append((name, seconds)))
+        session.open(pathname)
+        calls = [(name, seconds) for name, seconds in calls if not name.startswith('GET ')]
+        print(f"\nload {pathname}: {len(calls)} callbacks, {sum(s for _, s in calls) * 1000:.1f} ms")
+        for name in sorted(set(name for name, _ in calls)):
+            print(f"  {sum(n == name for n, _ in calls)} x {name}")
+        if sorted(name for name, _ in calls) != sorted(expected):
+            unexpected.append(pathname)
+            print(f"  expected 1 x each of: {', '.join(sorted(expected))}")
+    if unexpected:
+        sys.exit(f"unexpected callbacks on page load: {', '.join(unexpected)}")
+
+
+# Backends
+def startup_and_peak_rss(backend):
+    # VmHWM, not ru_maxrss, which a child inherits from this (already loaded) process.
+    code = ('import time; start = time.perf_counter(); import app; '
+            'print(time.perf_counter() - start, open("/proc/self/status").read().split("VmHWM:")[1].split()[0])')
+    out = subprocess.run([sys.executable, '-c', code], env=dict(os.environ, DASH_DATA_BACKEND=backend),
+                         capture_output=True, text=True, check=True).stdout.split()
+    return float(out[-2]), int(out[-1]) / 1024
+
+
+def bench_backends(args):
+    if not os.path.isdir(backends.PARQUET_DIR):
+        backends.build_parquet(app.DATA_PATH, backends.PARQUET_DIR)
+    print(f"\napp import (load, cube, filter index, warm figures), {row_count():,} rows")
+    for backend in ('pandas', 'parquet'):
+        seconds, mb = startup_and_peak_rss(backend)
+        print(f"  {backend:<8} {seconds:>8.2f} s  peak RSS {mb:>8.1f} MB")
+
+
+# Figures
+def figure_calls(cities):
+    """(callback, args) for every figure callback, over every filter value of the first cities."""
+    calls = [('update_dashboard_chart1', ('chart1-dashboard',)), ('update_dashboard_chart2', ('chart2-dashboard',))]
+    calls += [('update_dashboard_chart3', (option['value'],)) for option in app.metric_dropdown_dashboard.options]
+    calls += [('update_country_chart1', (None, None)), ('update_country_chart4', (None, None, None, None))]
+    for country in app.filter_options('country'):
+        for city in app.filter_options('city', ('country', country))[:cities]:
+            path = (('country', country), ('city', city))
+            calls.append(('update_country_chart1', (country, city)))
+            for furnishing in app.filter_options('furnishing_status', *path):
+                calls.append(('update_country_chart2', (country, city, furnishing)))
+                calls += [('update_country_chart3', (country, city, furnishing, option['value']))
+                          for option in app.financial_metric_dropdown_country.options]
+                calls += [('update_country_chart4', (country, city, furnishing, rooms))
+                          for rooms in app.filter_options('rooms', *path, ('furnishing_status', furnishing))]
+            calls += [('update_country_chart5', (country, city, connectivity))
+                      for connectivity in app.filter_options('connectivity_score', *path)]
+    return calls
+
+
+def bench_figures(args):
+    """Figure-build time per callback with px and with templates, checking their JSON is identical."""
+    calls = figure_calls(args.cities)
+    results, times = {}, {}
+    for px_figures in (True, False):
+        figures.PX_FIGURES = px_figures
+        for name, call_args in calls:
+            build = inspect.unwrap(getattr(app, name))  # past the figure cache and memo
+            start = time.perf_counter()
+            fig = build(*call_args)
+            times.setdefault((name, px_figures), []).append((time.perf_counter() - start) * 1000)
+            results[px_figures, name, call_args] = json.loads(to_json_plotly(fig))
+    mismatched = [(name, call_args) for name, call_args in calls
+                  if results[True, name, call_args] != results[False, name, call_args]]
+    names = list(dict.fromkeys(name for name, _ in calls))
+    report(f"figure build per callback, median over inputs (px | template), {row_count():,} rows", [
+        (name, statistics.median(times[name, True]), statistics.median(times[name, False])) for name in names])
+    print(f"\nJSON identical for {len(calls) - len(mismatched)} of {len(calls)} figures")
+    for name, call_args in mismatched:
+        print(f"  differs: {name}{call_args}")
+    if mismatched:
+        sys.exit(1)
+
+
+# Transfer
+def browser_transport(client, encoding, cache, transfers):
+    """loadtest-style send() acting as a browser tab. It fetches the scripts and stylesheets
+    a page references, keeps each response in cache (reused while its max-age lasts, else
+    revalidated with its ETag, as assets/conditional_requests.js does for callbacks) and
+    appends (bytes received, seconds) per request to transfers."""
+    decoders = {'gzip': gzip.decompress, 'br': compression.brotli and compression.brotli.decompress}
+
+    def send(method, path, body=None):
+        key = (method, path, json.dumps(body, sort_keys=True))
+        kept = cache.get(key)
+        if kept and kept['fresh']: return 200, kept['payload']
+        headers = {'Accept-Encoding': encoding} if encoding else {}
+        if kept and kept['etag']:
+            headers['If-None-Match'] = kept['etag']
+        start = time.perf_counter()
+        response = client.open(path, method=method, json=body, headers=headers)
+        received = response.get_data()
+        transfers.append((len(received), time.perf_counter() - start))
+        if response.status_code == 304: return 200, kept['payload']
+        encoding_used = response.headers.get('Content-Encoding')
+        payload = decoders[encoding_used](received) if encoding_used else received
+        cache[key] = {'etag': response.headers.get('ETag'), 'fresh': bool(response.cache_control.max_age),
+                      'payload': payload}
+        if method == 'GET' and not path.startswith('/_'):
+            for asset in re.findall(r'(?:src|href)="(/[^"]+)"', payload.decode()):
+                send('GET', asset)
+        return response.status_code, payload
+    return send
+
+
+def bench_transfer(args):
+    """Bytes received and modelled time-to-interactive of full page loads: the page, its
+    scripts, layout, dependencies and every callback fired on mount, one request at a time.
+    Time-to-interactive adds to the server time each response's transfer at --bandwidth
+    plus one --rtt per request; a repeat visit reuses the first visit's browser cache."""
+    client = app.server.test_client()
+    modes = [('uncompressed', False, None), ('gzip', True, 'gzip')]
+    if compression.brotli is not None:
+        modes.append(('br', True, 'br, gzip'))
+    print(f"\nfull page load at {args.bandwidth:g} Mbit/s, {args.rtt:g} ms RTT "
+          f"(requests, KB received, time-to-interactive)")
+    for pathname in ('/', '/country-wise'):
+        print(f"  {pathname}")
+        for name, enabled, encoding in modes:
+            compression.ENABLED = enabled
+            loads = []
+            for visits in (1, 2, 2):  # a discarded warm-up, then a fresh tab: first and repeat visit
+                cache = {}
+                for _ in range(visits):
+                    transfers = []
+                    loadtest.Session(browser_transport(client, encoding, cache, transfers),
+                                     lambda *_, **__: None).open(pathname)
+                    received = sum(size for size, _ in transfers)
+                    tti = sum(seconds for _, seconds in transfers) * 1000 \
+                        + received * 8 / (args.bandwidth * 1000) + len(transfers) * args.rtt
+                    loads.append((len(transfers), received / 1024, tti))
+            for visit, (count, kb, tti) in zip(('first', 'repeat'), loads[-2:]):
+                print(f"    {name:<13} {visit:<7} {count:>4}  {kb:>9.1f} KB  {tti:>9.1f} ms")
+    compression.ENABLED = True
+
+
+# Client-side
+# The countryCharts.render outputs, in the order of its clientside_callback in app.py.
+CLIENTSIDE_OUTPUTS = [('furnishing-dropdown-country', 'options'), ('furnishing-dropdown-country', 'value'),
+                      ('rooms-dropdown-country', 'options'), ('rooms-dropdown-country', 'value'),
+                      ('connectivity-dropdown-country', 'options'), ('connectivity-dropdown-country', 'value'),
+                      *[(f'chart{i}-country', 'figure') for i in range(1, 6)]]
+NO_UPDATE = '<no_update>'
+
+# Runs render() from assets/country_charts.js for each call in the JSON file argv[3].
+CLIENTSIDE_RUNNER = '''
+global.window = {dash_clientside: {no_update: '%s', callback_context: {triggered: []}}};
+require(process.argv[2]);
+const {skeletons, tables, calls} = JSON.parse(require('fs').readFileSync(process.argv[3], 'utf8'));
+const render = window.dash_clientside.countryCharts.render;
+process.stdout.write(JSON.stringify(calls.map(([table, args, trigger]) => {
+    window.dash_clientside.callback_context.triggered = trigger ? [{prop_id: trigger + '.value'}] : [];
+    return render(table === null ? null : tables[table], ...args, skeletons);
+})));
+''' % NO_UPDATE
+
+
+def decode_typed_arrays(value):
+    """value with Plotly typed arrays ({'dtype', 'bdata'}) replaced by plain lists."""
+    if isinstance(value, dict):
+        if 'bdata' in value:
+            array = np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype'])
+            shape = value.get('shape')
+            return (array.reshape([int(n) for n in shape.split(',')]) if shape else array).tolist()
+        return {key: decode_typed_arrays(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_typed_arrays(item) for item in value]
+    return value
+
+
+def country_interactions():
+    """(country, city, furnishing, rooms, connectivity, metric, changed) for every filter
+    change on every city, plus values with no data and cleared dropdowns."""
+    metrics = [option['value'] for option in app.financial_metric_dropdown_country.options]
+    changes = [(None, None, None, None, None, metrics[0], 'city-dropdown-country')]
+    for country in app.filter_options('country'):
+        for city in app.filter_options('city', ('country', country)):
+            path = (('country', country), ('city', city))
+            changes.append((country, city, None, None, None, metrics[0], 'city-dropdown-country'))
+            for furnishing in app.filter_options('furnishing_status', *path) + ['(none)']:
+                changes.append((country, city, furnishing, None, None, metrics[0], 'furnishing-dropdown-country'))
+                changes += [(country, city, furnishing, None, None, metric, 'financial-metric-dropdown-country')
+                            for metric in metrics[1:]]
+                changes += [(country, city, furnishing, rooms, None, metrics[0], 'rooms-dropdown-country')
+                            for rooms in app.filter_options('rooms', *path, ('furnishing_status', furnishing)) + [99, None]]
+            changes += [(country, city, None, None, connectivity, metrics[0], 'connectivity-dropdown-country')
+                        for connectivity in app.filter_options('connectivity_score', *path) + [99, None]]
+    return changes
+
+
+def bench_clientside(args):
+    """Replay every country-page interaction through the server callback (over HTTP) and
+    through assets/country_charts.js under node; fail unless both give the same outputs."""
+    if app.CLIENTSIDE_CHARTS:
+        sys.exit("clientside compares against the server callback, which DASH_CLIENTSIDE_CHARTS=1 "
+                 "does not register: run it without DASH_CLIENTSIDE_CHARTS")
+    test_client = app.server.test_client()
+    output_key = next(key for key in app.app.callback_map if 'chart1-country.figure' in key)
+    skeletons, tables, calls, expected = app.country_chart_skeletons(), {}, [], []
+    start = time.perf_counter()
+    for country, city, furnishing, rooms, connectivity, metric, changed in country_interactions():
+        values = {'country-dropdown-main': country, 'city-dropdown-country': city,
+                  'furnishing-dropdown-country': furnishing, 'rooms-dropdown-country': rooms,
+                  'connectivity-dropdown-country': connectivity, 'financial-metric-dropdown-country': metric}
+        response = test_client.post('/_dash-update-component', json=callback_request(output_key, values, changed))
+        expected.append(decode_typed_arrays(response.get_json()['response']))
+        table = f'{country}/{city}' if city else None
+        if table and table not in tables:
+            tables[table] = app.city_aggregates(country, city)
+        # On the client, a new city arrives as its aggregate table.
+        calls.append((table, [furnishing, rooms, connectivity, metric],
+                       'city-aggregates' if changed == 'city-dropdown-country' else changed))
+    server_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runner, data = os.path.join(tmp, 'runner.js'), os.path.join(tmp, 'calls.json')
+        with open(runner, 'w') as f:
+            f.write(CLIENTSIDE_RUNNER)
+        with open(data, 'w') as f:
+            json.dump({'skeletons': skeletons, 'tables': tables, 'calls': calls}, f, default=lambda o: o.item())
+        start = time.perf_counter()
+        script = os.path.join(os.path.dirname(os.path.abspath(app.__file__)), 'assets', 'country_charts.js')
+        outputs = json.loads(subprocess.run(['node', runner, script, data], capture_output=True, text=True,
+                                            check=True).stdout)
+        client_seconds = time.perf_counter() - start
+
+    mismatched = 0
+    for (table, call_args, trigger), server, client_outputs in zip(calls, expected, outputs):
+        server.pop('city-dropdown-country', None)  # answered by update_city_aggregates on the client
+        rendered = {}
+        for (component, prop), value in zip(CLIENTSIDE_OUTPUTS, client_outputs):
+            if value != NO_UPDATE:
+                rendered.setdefault(component, {})[prop] = value
+        if rendered != server:
+            mismatched += 1
+            differing = sorted(set(rendered) ^ set(server) | {c for c in rendered if rendered[c] != server.get(c)})
+            print(f"  differs: {trigger} {table} {call_args}: {differing}")
+    figures_compared = sum(component.startswith('chart') for server in expected for component in server)
+    print(f"\n{len(calls)} interactions, {figures_compared} figures: server {server_seconds:.1f} s (HTTP), "
+          f"client {client_seconds:.1f} s (node)")
+    print(f"  outputs identical for {len(calls) - mismatched} of {len(calls)} interactions")
+    if mismatched:
+        sys.exit(1)
+
+
+BENCHMARKS = {
+    'callbacks': bench_callbacks,
+    'memory': bench_memory,
+    'startup': bench_startup,
+    'workers': bench_workers,
+    'payload': bench_payload,
+    'interaction': bench_interaction,
+    'pages': bench_pages,
+    'backends': bench_backends,
+    'figures': bench_figures,
+    'transfer': bench_transfer,
+    'clientside': bench_clientside,
+}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--port', type=int, default=8051)
+    parser.add_argument('--cities', type=int, default=2, help='cities per country for figures')
+    parser.add_argument('--bandwidth', type=float, default=10, help='Mbit/s for transfer')
+    parser.add_argument('--rtt', type=float, default=50, help='round-trip ms for transfer')
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
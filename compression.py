@@ -0,0 +1,100 @@
+"""Compressed, validated HTTP responses, callback results from /_dash-update-component included.
+
+register(server) post-processes every successful response of a text type (JSON,
+JavaScript, CSS, HTML):
+
+    ETag          a hash of the body. A request whose If-None-Match carries it is
+                  answered 304 without a body: page GETs by the browser cache, callback
+                  POSTs by assets/conditional_requests.js, which keeps the last answer to
+                  each distinct callback request.
+    compression   br if the client accepts it and brotli is installed (optional: pip
+                  install brotli), else gzip, for bodies of DASH_COMPRESS_MIN_BYTES
+                  (default 1024) or more; smaller ones fit a packet either way.
+
+Compressed bodies are kept in a per-process LRU by hash, so a figure served again, to
+any client, costs a hash rather than another compression. DASH_COMPRESS=0 turns all of
+it off.
+"""
+import collections
+import gzip
+import hashlib
+import os
+import threading
+
+import flask
+
+import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENABLED = os.environ.get('DASH_COMPRESS', '1') == '1'
+MIN_BYTES = int(os.environ.get('DASH_COMPRESS_MIN_BYTES', 1024))
+CACHE_BYTES = 32 << 20
+COMPRESSIBLE = {'application/json', 'application/javascript', 'text/javascript', 'text/css', 'text/html', 'text/plain'}
+
+# Fast settings: most bodies are compressed on the request that first produces them.
+ENCODERS = {'gzip': lambda data: gzip.compress(data, compresslevel=6, mtime=0)}
+if brotli is not None:
+    ENCODERS = {'br': lambda data: brotli.compress(data, quality=5), **ENCODERS}
+
+
+class CompressedCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, data):
+        """The body data compressed by key's encoding, compressing it on a miss."""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                return body
+        body = ENCODERS[key[1]](data)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = body
+                self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                self._bytes -= len(self._entries.popitem(last=False)[1])
+        return body
+
+
+_compressed = CompressedCache(CACHE_BYTES)
+
+
+def _finish(response):
+    if not ENABLED or response.status_code != 200 or response.direct_passthrough or response.is_streamed \
+            or response.mimetype not in COMPRESSIBLE or 'Content-Encoding' in response.headers:
+        return response
+    request = flask.request
+    data = response.get_data()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if 'ETag' not in response.headers:
+        # Weak: the tag names the content, whichever encoding carries it.
+        response.headers['ETag'] = f'W/"{digest}"'
+    response.vary.add('Accept-Encoding')
+    if request.if_none_match.contains_weak(digest):
+        metrics.increment('dash_http_not_modified_total', method=request.method)
+        not_modified = flask.Response(status=304)
+        for header in ('ETag', 'Cache-Control', 'Vary'):
+            if header in response.headers:
+                not_modified.headers[header] = response.headers[header]
+        return not_modified
+    encoding = request.accept_encodings.best_match(list(ENCODERS))
+    if encoding is None or len(data) < MIN_BYTES:
+        return response
+    response.set_data(_compressed.get((digest, encoding), data))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def register(server):
+    """Tag and compress server's responses. after_request hooks run in reverse order, so
+    hooks registered earlier, like the metrics one, see the response as it is sent."""
+    server.after_request(_finish)
@@ -0,0 +1,170 @@
+"""Typed loading of the housing dataset, with a binary column cache.
+
+The CSV is parsed once into a directory of .npy files next to it (one per column,
+categoricals stored as integer codes) keyed by the source file's hash and mtime.
+Later loads read the binary bundle and only fall back to parsing text, regenerating
+the bundle, when the CSV has changed. To build the cache ahead of time:
+
+    python dataset.py build [path]
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+DATA_PATH = os.environ.get('DASH_DATA_PATH', 'global_house_purchase_dataset.csv')
+
+# Schema
+# String dimensions load as categoricals (equality masks compare integer codes) and every
+# numeric column is narrowed to the smallest dtype that holds its values exactly.
+CATEGORY_COLUMNS = ['country', 'city', 'property_type', 'furnishing_status']
+
+def narrow_numeric(column):
+    if pd.api.types.is_bool_dtype(column):
+        return column
+    if pd.api.types.is_integer_dtype(column):
+        return pd.to_numeric(column, downcast='integer')
+    narrowed = column.astype('float32')
+    return narrowed if (narrowed == column).all() else column
+
+def read_csv(path):
+    data = pd.read_csv(path, dtype={col: 'category' for col in CATEGORY_COLUMNS})
+    # Any other text column is stored as a categorical too, so every column has a binary form.
+    # Categories are sorted: the parser unions them per chunk in order of appearance.
+    return data.apply(lambda column: narrow_numeric(column) if pd.api.types.is_numeric_dtype(column)
+                      else column.astype('category').cat.reorder_categories(sorted(column.dropna().unique())))
+
+def memory_footprint(data):
+    """Bytes held by each column of data, deepest count for object columns."""
+    return data.memory_usage(index=False, deep=True)
+
+# Binary cache
+def cache_dir(path):
+    return f'{path}.cache'
+
+def source_key(path, digest=True):
+    stat = os.stat(path)
+    key = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if digest:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        key['sha256'] = sha.hexdigest()
+    return key
+
+def source_digest(path):
+    """sha256 of path's contents, taken from the cache meta when that was built from this
+    very file (same size and mtime), so only a changed or new file is hashed."""
+    meta, current = read_meta(path), source_key(path, digest=False)
+    if meta is not None and all(meta['source'][k] == current[k] for k in ('size', 'mtime_ns')):
+        return meta['source']['sha256']
+    return source_key(path)['sha256']
+
+def read_meta(path):
+    try:
+        with open(os.path.join(cache_dir(path), 'meta.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def cache_is_fresh(path):
+    """True when the cache was built from the current contents of path.
+
+    Size and mtime decide the common case; a changed mtime with identical bytes (a
+    touch or a re-copy) is still fresh, which the content hash settles.
+    """
+    meta = read_meta(path)
+    if meta is None: return False
+    cached, current = meta['source'], source_key(path, digest=False)
+    if cached['size'] != current['size']: return False
+    return cached['mtime_ns'] == current['mtime_ns'] or cached['sha256'] == source_key(path)['sha256']
+
+def write_cache(data, path):
+    """Write data as a .npy-per-column bundle, swapped into place in one rename."""
+    parent = os.path.dirname(os.path.abspath(path))
+    tmp = tempfile.mkdtemp(prefix='.cache-', dir=parent)
+    columns = []
+    for i, (name, column) in enumerate(data.items()):
+        spec = {'name': name, 'file': f'{i}.npy'}
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            spec['categories'] = column.cat.categories.tolist()
+            values = column.cat.codes.to_numpy()
+        else:
+            values = column.to_numpy()
+        np.save(os.path.join(tmp, spec['file']), values, allow_pickle=False)
+        columns.append(spec)
+    with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+        json.dump({'source': source_key(path), 'columns': columns}, f)
+    target = cache_dir(path)
+    stale = f'{tmp}.old'
+    try:
+        os.rename(target, stale)
+    except OSError:
+        pass
+    try:
+        os.rename(tmp, target)
+    except OSError:
+        # Another process published a cache for the same source first.
+        shutil.rmtree(tmp, ignore_errors=True)
+    shutil.rmtree(stale, ignore_errors=True)
+
+def read_cache(path, mmap_mode=None):
+    """The cached frame, or None if the cache went away while being read: another
+    process's write_cache briefly renames it aside to swap in its own."""
+    directory = cache_dir(path)
+    meta = read_meta(path)
+    if meta is None: return None
+    columns = {}
+    for spec in meta['columns']:
+        try:
+            values = np.load(os.path.join(directory, spec['file']), mmap_mode=mmap_mode, allow_pickle=False)
+        except OSError:
+            return None
+        if 'categories' in spec:
+            # Codes come from write_cache, so skip validation (it would also copy a mapped array).
+            values = pd.Categorical.from_codes(values, spec['categories'], validate=False)
+        columns[spec['name']] = values
+    return pd.DataFrame(columns, copy=False)
+
+# Load data
+def read_dataset(path=DATA_PATH, mmap=False):
+    """Load path from its binary cache when fresh, else parse the CSV and rebuild the cache.
+
+    With mmap=True the columns are mapped read-only from the cache files, so every
+    process loading the same dataset shares one copy through the OS page cache.
+    """
+    if mmap:
+        if not cache_is_fresh(path):
+            data = read_csv(path)
+            try:
+                write_cache(data, path)
+            except OSError as exc:
+                log.warning("Cannot write the binary cache for %s (%s): loading it unshared, so "
+                            "workers will not share the dataset's memory", path, exc)
+                return data
+        data = read_cache(path, mmap_mode='r')
+        return read_csv(path) if data is None else data
+    data = read_cache(path) if cache_is_fresh(path) else None
+    if data is not None: return data
+    data = read_csv(path)
+    try:
+        write_cache(data, path)
+    except OSError:
+        pass  # read-only deployments still work, just without the fast path
+    return data
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'build':
+        sys.exit(__doc__)
+    source = sys.argv[2] if len(sys.argv) > 2 else DATA_PATH
+    write_cache(read_csv(source), source)
+    print(f"Cached {source} -> {cache_dir(source)}")
@@ -0,0 +1,133 @@
+"""Plotly figures as plain dicts, filled into templates rendered once with plotly.express.
+
+Building a figure through plotly.express reshapes a DataFrame and validates every
+property on each call, tens of milliseconds to draw a handful of aggregated points.
+Each chart is still defined as a px function of its data, but it is rendered once per
+set of styling parameters and kept as JSON: layout, theme and a styled prototype
+trace. Requests copy that template and only set the data arrays, encoded the way
+Figure.to_dict() encodes them, so the JSON is the same as px's:
+
+    python benchmark.py figures
+
+times both paths for every chart and checks that they agree.
+"""
+import functools
+import json
+import os
+import threading
+
+import numpy as np
+import plotly.express as px
+
+try:
+    # The typed-array encoding plotly (6+) applies to numeric arrays in Figure.to_dict().
+    from _plotly_utils.utils import to_typed_array_spec
+except ImportError:
+    to_typed_array_spec = None  # plotly 5 writes plain lists
+
+# DASH_PX_FIGURES=1 renders every chart with plotly.express on each call instead.
+PX_FIGURES = os.environ.get('DASH_PX_FIGURES') == '1'
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def chart(fill):
+    """Decorator for a chart defined with px as build(data, *params, **labels).
+
+    The decorated function returns fill(template, data, *params, **labels), template
+    being build's JSON the first time those params were seen: positional params may
+    style the figure, keyword labels (e.g. a title) must be set again by fill. build
+    itself stays available as .px.
+    """
+    def decorator(build):
+        @functools.wraps(build)
+        def wrapper(data, *params, **labels):
+            if PX_FIGURES: return build(data, *params, **labels)
+            key = (build, params)
+            template = _templates.get(key)
+            if template is None:
+                with _templates_lock:
+                    template = _templates.setdefault(key, json.loads(build(data, *params, **labels).to_json()))
+            return fill(template, data, *params, **labels)
+        wrapper.px = build
+        return wrapper
+    return decorator
+
+
+@functools.cache
+def blank(kind, height, title=None):
+    """JSON of an empty px.<kind>() figure, shown while filters are unset or match nothing."""
+    fig = getattr(px, kind)(**({'title': title} if title else {}))
+    return json.loads(fig.update_layout(height=height).to_json())
+
+
+def array(values):
+    """values as they appear in figure JSON: a typed array if numeric, else a list."""
+    if to_typed_array_spec is None: return np.asarray(values).tolist()
+    encoded = to_typed_array_spec(np.asarray(values))
+    return encoded.tolist() if isinstance(encoded, np.ndarray) else encoded
+
+
+def figure(template, data, **layout):
+    """A figure of template's layout with data; dict values in layout update the
+    template's dict of the same name, other values replace it."""
+    merged = dict(template['layout'])
+    for key, value in layout.items():
+        merged[key] = {**merged[key], **value} if isinstance(value, dict) else value
+    return {'data': data, 'layout': merged}
+
+
+def trace(template, **props):
+    """A copy of template's first trace with props set, dicts updated like figure()'s layout."""
+    base = template['data'][0]
+    return {**base, **{key: {**base[key], **value} if isinstance(value, dict) else value
+                       for key, value in props.items()}}
+
+
+def _colorway(template):
+    return template['layout']['template']['layout']['colorway']
+
+
+# Chart types
+# One per way the dashboard calls px. Arguments are the columns px would have read.
+def discrete_bars(template, categories, values):
+    """px.bar(x=category, y=value, color=category): one trace per category, in order."""
+    colors, categories = _colorway(template), list(categories)
+    return figure(template, [
+        trace(template, name=c, legendgroup=c, x=[c], y=array([v]), marker={'color': colors[i % len(colors)]})
+        for i, (c, v) in enumerate(zip(categories, values))
+    ], xaxis={'categoryarray': categories})
+
+
+def continuous_bars(template, x, y):
+    """px.bar(x=x, y=y, color=y): one trace, coloured along the colour axis."""
+    y = array(y)
+    return figure(template, [trace(template, x=list(x), y=y, marker={'color': y})])
+
+
+def discrete_scatter(template, categories, x, y, size, size_max):
+    """px.scatter(x=x, y=y, size=size, color=category, text=category): one trace per category."""
+    colors, sizeref = _colorway(template), max(size) / size_max ** 2
+    return figure(template, [
+        trace(template, name=c, legendgroup=c, text=[c], x=array([xi]), y=array([yi]),
+              marker={'color': colors[i % len(colors)], 'size': array([si]), 'sizeref': sizeref})
+        for i, (c, xi, yi, si) in enumerate(zip(categories, x, y, size))
+    ])
+
+
+def donut(template, labels, values, title, pull):
+    """px.pie(names=labels, values=values, title=title) with per-slice pull."""
+    return figure(template, [trace(template, labels=list(labels), values=array(values), pull=pull)],
+                  title={'text': title})
+
+
+def choropleth(template, locations, values):
+    """px.choropleth(locations=locations, color=values, hover_name=locations)."""
+    locations = list(locations)
+    return figure(template, [trace(template, locations=locations, hovertext=locations, z=array(values))])
+
+
+def heatmap(template, frame):
+    """px.imshow(frame, x=frame.columns, y=frame.index)."""
+    return figure(template, [trace(template, x=list(frame.columns), y=list(frame.index), z=array(frame))])
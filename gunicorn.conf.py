@@ -0,0 +1,15 @@
+"""gunicorn settings, picked up by: gunicorn app:server
+
+The app is imported once in the master (preload_app) and then forked, so workers start
+with the dataset, cube and figure cache already built. DASH_SHARED_DATA maps the dataset
+columns read-only from the binary cache, so the page cache holds a single copy and each
+extra worker costs little more than its own interpreter. DASH_PRELOAD=0 imports the app
+in each worker instead (the mapped columns are still shared).
+"""
+import os
+
+os.environ.setdefault('DASH_SHARED_DATA', '1')
+
+bind = os.environ.get('BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+preload_app = os.environ.get('DASH_PRELOAD', '1') == '1'
@@ -0,0 +1,106 @@
+"""Incremental ingestion of purchase records from a drop directory.
+
+Batches are CSV files with the dataset's columns. Every process watching the directory
+applies each file once, in name order, so all gunicorn workers converge on the same
+rows, and a restarted process re-applies the directory on top of the base CSV. Writers
+must create files atomically: write elsewhere, then rename into the directory. A batch
+that cannot be applied is renamed to <name>.failed and not tried again.
+
+POST /ingest accepts a CSV body, checks it and publishes it to the directory the same
+way. It is only mounted with a token, which it requires as "Authorization: Bearer <token>".
+"""
+import contextlib
+import hmac
+import io
+import logging
+import os
+import threading
+import time
+import uuid
+
+import flask
+import pandas as pd
+
+from dataset import read_csv
+
+log = logging.getLogger(__name__)
+
+
+class DropDirectory:
+    def __init__(self, path, apply, interval=5.0):
+        self.path, self.apply, self.interval = path, apply, interval
+        self.applied = set()
+        self._lock = threading.Lock()
+        self._watcher_pid = None
+        os.makedirs(path, exist_ok=True)
+
+    def pending(self):
+        return sorted(name for name in os.listdir(self.path)
+                      if name.endswith('.csv') and not name.startswith('.') and name not in self.applied)
+
+    def poll(self):
+        with self._lock:
+            for name in self.pending():
+                path = os.path.join(self.path, name)
+                try:
+                    self.apply(name, read_csv(path))
+                except Exception:
+                    # Any error: a batch that breaks the watcher would also break every restart.
+                    log.exception("ingest batch %s failed; renamed to %s.failed", name, name)
+                    with contextlib.suppress(OSError):  # another worker may have renamed it first
+                        os.replace(path, f'{path}.failed')
+                self.applied.add(name)
+
+    def ensure_watching(self):
+        """Start the polling thread in this process; threads do not survive a fork, so
+        every gunicorn worker starts its own on its first request."""
+        if self._watcher_pid == os.getpid():
+            return
+        self._watcher_pid = os.getpid()
+        threading.Thread(target=self._watch, name='ingest-watcher', daemon=True).start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            self.poll()
+
+    def publish(self, text):
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.csv"
+        tmp = os.path.join(self.path, f'.{name}.tmp')
+        with open(tmp, 'w') as f:
+            f.write(text)
+        os.replace(tmp, os.path.join(self.path, name))
+        return name
+
+
+def check_batch(batch, columns, numeric):
+    """Raise ValueError unless batch has all of columns, numeric exactly where the dataset
+    is (a stray word in a number column would otherwise load it as text)."""
+    missing = set(columns) - set(batch.columns)
+    if missing:
+        raise ValueError(f"missing columns: {sorted(missing)}")
+    mismatched = [col for col in columns
+                  if batch[col].notna().any() and pd.api.types.is_numeric_dtype(batch[col]) != (col in numeric)]
+    if mismatched:
+        raise ValueError(f"columns not of the dataset's types: {mismatched}")
+
+
+def register(server, drop, check, token=None):
+    """Watch drop from every worker and, when a token is set, mount POST /ingest, which
+    publishes a batch once it parses and check(batch) does not raise ValueError."""
+    server.before_request(drop.ensure_watching)
+    if not token:
+        log.warning("DASH_INGEST_TOKEN is not set: POST /ingest is disabled, the drop directory still works")
+        return
+
+    def ingest_endpoint():
+        if not hmac.compare_digest(flask.request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return flask.jsonify(error='unauthorized'), 401
+        text = flask.request.get_data(as_text=True)
+        try:
+            check(read_csv(io.StringIO(text)))
+        except ValueError as exc:
+            return flask.jsonify(error=str(exc)), 400
+        return flask.jsonify(file=drop.publish(text)), 202
+
+    server.add_url_rule('/ingest', 'ingest', ingest_endpoint, methods=['POST'])
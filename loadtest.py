@@ -0,0 +1,340 @@
+"""Load test for the Dash callbacks: concurrent users replaying interaction sessions.
+
+Each virtual user opens / and /country-wise the way the browser does (the page,
+/_dash-layout, /_dash-dependencies, then every callback the renderer fires on mount,
+feeding outputs into the callbacks that depend on them), then changes the country,
+city, furnishing, rooms and connectivity dropdowns and the metric. Every request is
+timed and attributed to its callback; each user action is also timed until all the
+callbacks it set off have answered.
+
+    python loadtest.py generate --scale 100           # global_house_purchase_dataset.x100.csv
+    DASH_DATA_PATH=global_house_purchase_dataset.x100.csv \\
+        python loadtest.py run --users 8 --sessions 20 --save results/x100.json
+    python loadtest.py run --url http://127.0.0.1:8050 ...
+    python loadtest.py compare results/before.json results/after.json
+
+Without --url, run drives app.server in process, one thread per user, so it measures
+the app rather than a web server; point --url at gunicorn to include the workers.
+"""
+import argparse
+import contextlib
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+import pandas as pd
+
+from dataset import DATA_PATH
+
+# Synthetic data
+# Copies of the source rows with fresh ids and the money and size columns jittered, so a
+# scaled file keeps the same countries, cities and filter combinations with more rows each.
+JITTER_COLUMNS = ['property_size_sqft', 'price', 'customer_salary', 'loan_amount', 'down_payment']
+
+def generate(source, scale, out=None, seed=0):
+    out = out or f"{os.path.splitext(source)[0]}.x{scale}.csv"
+    data = pd.read_csv(source)
+    rng = np.random.default_rng(seed)
+    ids = data['property_id'].max() + 1 if 'property_id' in data else 0
+    tmp = f'{out}.tmp'
+    for copy in range(scale):
+        chunk = data.copy()
+        if copy:
+            if 'property_id' in chunk:
+                chunk['property_id'] += copy * ids
+            for col in [col for col in JITTER_COLUMNS if col in chunk]:
+                values = chunk[col] * rng.normal(1, 0.05, len(chunk)).clip(0.8, 1.2)
+                chunk[col] = values.round().astype(chunk[col].dtype) if pd.api.types.is_integer_dtype(chunk[col]) else values
+        chunk.to_csv(tmp, mode='w' if copy == 0 else 'a', header=copy == 0, index=False)
+    os.replace(tmp, out)
+    return out, len(data) * scale
+
+# Transports
+def wsgi_transport():
+    import app
+    client = app.server.test_client()
+
+    def send(method, path, body=None):
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+    return send
+
+def http_transport(url):
+    parts = urllib.parse.urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=300)
+
+    def send(method, path, body=None):
+        data = None if body is None else json.dumps(body).encode()
+        connection.request(method, path, body=data, headers={'Content-Type': 'application/json'} if data else {})
+        response = connection.getresponse()
+        return response.status, response.read()
+    return send
+
+# Renderer
+def parse_outputs(key):
+    """[(id, property), ...] from a dependency's output key, single or '..a.b...c.d..'."""
+    return [tuple(out.rsplit('.', 1)) for out in key.strip('.').split('...')] if key.startswith('..') \
+        else [tuple(key.rsplit('.', 1))]
+
+def callback_label(outputs):
+    """Requests are reported per callback under its first output, e.g. 'chart1-country.figure +12'."""
+    return '.'.join(outputs[0]) + (f' +{len(outputs) - 1}' if len(outputs) > 1 else '')
+
+def index_components(tree, nodes):
+    """Map each component id in a layout tree to its props dict (shared, not copied)."""
+    if isinstance(tree, list):
+        for child in tree:
+            index_components(child, nodes)
+    elif isinstance(tree, dict) and 'props' in tree and 'type' in tree:
+        props = tree['props']
+        if 'id' in props:
+            nodes[props['id']] = props
+        index_components(props.get('children'), nodes)
+    return nodes
+
+class Session:
+    """One browser tab: the layout it holds and the server callbacks reacting to it.
+
+    Callbacks fire one at a time, upstream first, as the renderer orders them; clientside
+    callbacks run in the browser and are skipped.
+    """
+    def __init__(self, send, record):
+        self.send, self.record = send, record
+        self.layout, self.nodes, self.callbacks = None, {}, []
+
+    def request(self, name, method, path, body=None):
+        start = time.perf_counter()
+        status, payload = self.send(method, path, body)
+        self.record('request', name, time.perf_counter() - start, status=status, size=len(payload))
+        return status, payload
+
+    def open(self, pathname):
+        self.request('GET ' + pathname, 'GET', pathname)
+        self.layout = json.loads(self.request('GET /_dash-layout', 'GET', '/_dash-layout')[1])
+        dependencies = json.loads(self.request('GET /_dash-dependencies', 'GET', '/_dash-dependencies')[1])
+        self.callbacks = [dict(dep, outputs=outputs, name=callback_label(outputs),
+                               input_ids=[(i['id'], i['property']) for i in dep['inputs']])
+                          for dep in dependencies if not dep.get('clientside_function')
+                          for outputs in [parse_outputs(dep['output'])]]
+        self.nodes = index_components(self.layout, {})
+        self.nodes['url']['pathname'] = pathname
+        self.settle(self.mounted(set(self.nodes)))
+
+    def change(self, component, prop, value):
+        self.nodes[component][prop] = value
+        self.settle({id(cb): (cb, [f'{component}.{prop}']) for cb in self.callbacks
+                     if (component, prop) in cb['input_ids']})
+
+    def value(self, component, prop):
+        return self.nodes.get(component, {}).get(prop)
+
+    def mounted(self, ids):
+        """Initial calls for callbacks touching newly rendered components whose inputs all exist."""
+        return {id(cb): (cb, []) for cb in self.callbacks
+                if not cb['prevent_initial_call'] and all(i in self.nodes for i, _ in cb['input_ids'])
+                and any(i in ids for i, _ in cb['input_ids'] + cb['outputs'])}
+
+    def settle(self, pending):
+        while pending:
+            waiting = {out for cb, _ in pending.values() for out in cb['outputs']}
+            ready = [(key, cb, changed) for key, (cb, changed) in pending.items()
+                     if not set(cb['input_ids']) & (waiting - set(cb['outputs']))] \
+                or [(key, *entry) for key, entry in pending.items()]
+            key, cb, changed = ready[0]
+            del pending[key]
+            for key, entry in self.fire(cb, changed).items():
+                if key not in pending:
+                    pending[key] = entry
+                else:
+                    pending[key][1].extend(entry[1])
+
+    def fire(self, cb, changed):
+        """POST one callback and apply its response; the callbacks it triggers, keyed by id."""
+        body = {'output': cb['output'],
+                'outputs': [{'id': i, 'property': p} for i, p in cb['outputs']] if len(cb['outputs']) > 1
+                else {'id': cb['outputs'][0][0], 'property': cb['outputs'][0][1]},
+                'inputs': [{'id': i, 'property': p, 'value': self.value(i, p)} for i, p in cb['input_ids']],
+                'state': [{'id': s['id'], 'property': s['property'], 'value': self.value(s['id'], s['property'])}
+                          for s in cb['state']],
+                'changedPropIds': changed}
+        status, payload = self.request(cb['name'], 'POST', '/_dash-update-component', body)
+        if status != 200: return {}
+        triggered, added = {}, set()
+        for component, props in json.loads(payload)['response'].items():
+            for prop, value in props.items():
+                if self.nodes.get(component, {}).get(prop) == value: continue
+                self.nodes.setdefault(component, {})[prop] = value
+                if prop == 'children':
+                    before = set(self.nodes)
+                    self.nodes = index_components(self.layout, {})
+                    added |= set(self.nodes) - before
+                for other in self.callbacks:
+                    if other is not cb and (component, prop) in other['input_ids']:
+                        triggered.setdefault(id(other), (other, []))[1].append(f'{component}.{prop}')
+        for key, entry in self.mounted(added).items():
+            triggered.setdefault(key, entry)
+        return triggered
+
+# Sessions
+COUNTRY_PAGE_ACTIONS = [
+    ('country', 'country-dropdown-main'),
+    ('city', 'city-dropdown-country'),
+    ('furnishing', 'furnishing-dropdown-country'),
+    ('rooms', 'rooms-dropdown-country'),
+    ('connectivity', 'connectivity-dropdown-country'),
+    ('metric', 'financial-metric-dropdown-country'),
+]
+
+def run_session(session, rng, action):
+    with action('load /'):
+        session.open('/')
+    with action('load /country-wise'):
+        session.open('/country-wise')
+    for name, component in COUNTRY_PAGE_ACTIONS:
+        current = session.value(component, 'value')
+        choices = [option['value'] for option in session.value(component, 'options') or []
+                   if option['value'] != current]
+        if not choices: continue
+        with action(f'change {name}'):
+            session.change(component, 'value', rng.choice(choices))
+
+def run(args):
+    samples, lock = [], threading.Lock()
+
+    def worker(user):
+        send = http_transport(args.url) if args.url else wsgi_transport()
+        rng = random.Random(args.seed + user)
+
+        def record(kind, name, seconds, **extra):
+            with lock:
+                samples.append({'kind': kind, 'name': name, 'seconds': seconds, **extra})
+
+        @contextlib.contextmanager
+        def action(name):
+            start = time.perf_counter()
+            yield
+            record('action', name, time.perf_counter() - start)
+
+        for _ in range(args.sessions):
+            run_session(Session(send, record), rng, action)
+
+    if not args.url:
+        wsgi_transport()  # load the data before the clock starts
+    threads = [threading.Thread(target=worker, args=(user,)) for user in range(args.users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(samples, time.perf_counter() - start, args)
+
+# Results
+def percentiles(values):
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {'count': len(ordered), 'p50_ms': pick(0.50), 'p95_ms': pick(0.95), 'p99_ms': pick(0.99),
+            'mean_ms': statistics.fmean(ordered) * 1000}
+
+def summarize(samples, elapsed, args):
+    requests = [s for s in samples if s['kind'] == 'request']
+    groups = {}
+    for s in requests:
+        groups.setdefault(s['name'], []).append(s)
+    actions = {}
+    for s in samples:
+        if s['kind'] == 'action':
+            actions.setdefault(s['name'], []).append(s['seconds'])
+    return {
+        'meta': {'target': args.url or 'in-process', 'data': None if args.url else DATA_PATH,
+                 'users': args.users, 'sessions': args.sessions, 'seed': args.seed, 'commit': git_commit(),
+                 'started': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'overall': {**percentiles([s['seconds'] for s in requests]), 'seconds': elapsed,
+                    'requests_per_s': len(requests) / elapsed,
+                    'actions_per_s': sum(map(len, actions.values())) / elapsed,
+                    'errors': sum(s['status'] >= 400 for s in requests)},
+        'requests': {name: {**percentiles([s['seconds'] for s in group]),
+                            'mean_kb': statistics.fmean(s['size'] for s in group) / 1024,
+                            'errors': sum(s['status'] >= 400 for s in group)}
+                     for name, group in sorted(groups.items())},
+        'actions': {name: percentiles(values) for name, values in actions.items()},
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def print_results(results):
+    meta, overall = results['meta'], results['overall']
+    print(f"{meta['target']}  data={meta['data'] or 'as served'}  users={meta['users']}  sessions/user={meta['sessions']}")
+    print(f"  {overall['count']} requests in {overall['seconds']:.1f} s: {overall['requests_per_s']:.1f} req/s, "
+          f"{overall['actions_per_s']:.2f} actions/s, {overall['errors']} errors")
+    for title, table in (('request', results['requests']), ('action', results['actions'])):
+        width = max(map(len, table), default=0)
+        print(f"\n  {title:<{width}}  {'count':>6}  {'p50 ms':>9}  {'p95 ms':>9}  {'p99 ms':>9}"
+              + (f"  {'mean KB':>9}" if title == 'request' else ''))
+        for name, row in table.items():
+            print(f"  {name:<{width}}  {row['count']:>6}  {row['p50_ms']:>9.1f}  {row['p95_ms']:>9.1f}  {row['p99_ms']:>9.1f}"
+                  + (f"  {row['mean_kb']:>9.1f}" if 'mean_kb' in row else ''))
+
+def compare(before, after):
+    """p50/p95/p99 per request and action, and overall throughput, before -> after."""
+    print(f"{before['meta'].get('commit')} -> {after['meta'].get('commit')}")
+    b, a = before['overall'], after['overall']
+    print(f"  throughput  {b['requests_per_s']:.1f} -> {a['requests_per_s']:.1f} req/s"
+          f"  ({(a['requests_per_s'] / b['requests_per_s'] - 1) * 100:+.0f}%)")
+    for section in ('requests', 'actions'):
+        names = [name for name in after[section] if name in before[section]]
+        width = max(map(len, names), default=0)
+        print(f"\n  {section[:-1]:<{width}}  " + "  ".join(f"{q:>24}" for q in ('p50 ms', 'p95 ms', 'p99 ms')))
+        for name in names:
+            cells = []
+            for q in ('p50_ms', 'p95_ms', 'p99_ms'):
+                old, new = before[section][name][q], after[section][name][q]
+                cells.append(f"{old:>7.1f} -> {new:>7.1f} {(new / old - 1) * 100 if old else 0:>+4.0f}%")
+            print(f"  {name:<{width}}  " + "  ".join(cells))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    gen = commands.add_parser('generate', help='write a scaled synthetic copy of the dataset')
+    gen.add_argument('--source', default=DATA_PATH)
+    gen.add_argument('--scale', type=int, choices=[10, 100, 1000], default=10)
+    gen.add_argument('--out')
+    gen.add_argument('--seed', type=int, default=0)
+    load = commands.add_parser('run', help='replay interaction sessions and report latency')
+    load.add_argument('--url', help='base URL of a running server; default drives app.server in process')
+    load.add_argument('--users', type=int, default=4, help='concurrent virtual users')
+    load.add_argument('--sessions', type=int, default=5, help='sessions per user')
+    load.add_argument('--seed', type=int, default=0)
+    load.add_argument('--save', help='write the results as JSON, for compare')
+    cmp = commands.add_parser('compare', help='compare two saved runs')
+    cmp.add_argument('before')
+    cmp.add_argument('after')
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        out, rows = generate(args.source, args.scale, args.out, args.seed)
+        print(f"Wrote {rows:,} rows -> {out}")
+    elif args.command == 'run':
+        results = run(args)
+        print_results(results)
+        if args.save:
+            os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+            with open(args.save, 'w') as f:
+                json.dump(results, f, indent=2)
+    else:
+        with open(args.before) as f, open(args.after) as g:
+            compare(json.load(f), json.load(g))
+
+if __name__ == '__main__':
+    main()
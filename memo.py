@@ -0,0 +1,192 @@
+"""Memoized callback results, keyed by the normalized input tuple.
+
+Results are stored as figure JSON in a bounded LRU store. The backend is chosen with
+DASH_MEMO_BACKEND:
+
+    memory  (default) an in-process store per worker
+    sqlite  one SQLite file at DASH_MEMO_PATH, shared by every worker on the host
+
+Both evict least recently used entries past DASH_MEMO_MAX_ENTRIES entries or
+DASH_MEMO_MAX_BYTES bytes of JSON; sqlite tracks use to within TOUCH_SECONDS, so most
+hits are plain reads. Keys include the dataset version, and clear() empties the store
+when the data is reloaded.
+
+DASH_FIGURE_SNAPSHOT names a read-only SQLite file of results rendered ahead of time for
+every reachable input (python precompute.py), looked up before the store. Its keys carry
+the version it was built from, so it stops answering once new data is loaded; a file
+built from other data than the app loads is reported at startup.
+"""
+import collections
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from plotly.io.json import to_json_plotly
+
+import metrics
+
+log = logging.getLogger(__name__)
+
+
+class MemoryStore:
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries, self.max_bytes = max_entries, max_bytes
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, text):
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, len(text))
+            self._bytes += len(text)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# How stale an SQLite entry's last-used time may get before a hit rewrites it.
+TOUCH_SECONDS = 60
+
+
+class SQLiteStore:
+    def __init__(self, path, max_entries, max_bytes):
+        self.path, self.max_entries, self.max_bytes = path, max_entries, max_bytes
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS memo '
+                       '(key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)')
+
+    def _connect(self):
+        # One connection per thread, and never one inherited across a fork (preload_app
+        # opens it in the gunicorn master while warming the caches).
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.db = sqlite3.connect(self.path, timeout=30)
+            self._local.db.execute('PRAGMA journal_mode=WAL')
+            self._local.pid = os.getpid()
+        return self._local.db
+
+    def get(self, key):
+        db = self._connect()
+        row = db.execute('SELECT value, used FROM memo WHERE key = ?', (key,)).fetchone()
+        if row is None: return None
+        # Recency only needs to be coarse: refreshing it on every hit would put each read
+        # behind SQLite's single write lock, shared by all the workers.
+        now = time.time()
+        if now - row[1] > TOUCH_SECONDS:
+            with db:
+                db.execute('UPDATE memo SET used = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def put(self, key, value, text):
+        with self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?)', (key, text, len(text), time.time()))
+            db.execute('DELETE FROM memo WHERE key IN ('
+                       ' SELECT key FROM (SELECT key,'
+                       '  SUM(size) OVER (ORDER BY used DESC, key) AS total,'
+                       '  ROW_NUMBER() OVER (ORDER BY used DESC, key) AS n FROM memo)'
+                       ' WHERE total > ? OR n > ?)', (self.max_bytes, self.max_entries))
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute('DELETE FROM memo')
+
+
+class PrecomputedStore:
+    """Results written by write_precomputed(), in front of store, which takes the misses."""
+
+    def __init__(self, path, store):
+        self.path, self.store = path, store
+        self._local = threading.local()
+        self.meta = dict(self._connect().execute('SELECT name, value FROM meta').fetchall())
+
+    def _connect(self):
+        # One read-only connection per thread, and never one inherited across a fork.
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.db = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+            self._local.pid = os.getpid()
+        return self._local.db
+
+    def check_version(self, version):
+        """Warn when the file was built from other data than version: none of its keys match."""
+        if self.meta.get('version') != version:
+            log.warning("DASH_FIGURE_SNAPSHOT %s was built from dataset version %s, not %s: every lookup "
+                        "falls through to live rendering until it is rebuilt (python precompute.py)",
+                        self.path, self.meta.get('version'), version)
+
+    def get(self, key):
+        row = self._connect().execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None: return self.store.get(key)
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key, value, text):
+        self.store.put(key, value, text)
+
+    def clear(self):
+        self.store.clear()
+
+
+def write_precomputed(path, results, meta):
+    """Write (key, JSON text) results and a meta dict to a new file that replaces path."""
+    tmp = f'{path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    with sqlite3.connect(tmp) as db:
+        db.execute('CREATE TABLE results (key TEXT PRIMARY KEY, value BLOB NOT NULL) WITHOUT ROWID')
+        db.execute('CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        db.executemany('INSERT INTO results VALUES (?, ?)', ((key, zlib.compress(text.encode())) for key, text in results))
+        db.executemany('INSERT INTO meta VALUES (?, ?)', [(name, str(value)) for name, value in meta.items()])
+    db.close()
+    os.replace(tmp, path)
+
+
+def store_from_env():
+    max_entries = int(os.environ.get('DASH_MEMO_MAX_ENTRIES', 1024))
+    max_bytes = int(os.environ.get('DASH_MEMO_MAX_BYTES', 64 << 20))
+    if os.environ.get('DASH_MEMO_BACKEND', 'memory') == 'sqlite':
+        store = SQLiteStore(os.environ.get('DASH_MEMO_PATH', 'callback_memo.sqlite3'), max_entries, max_bytes)
+    else:
+        store = MemoryStore(max_entries, max_bytes)
+    snapshot = os.environ.get('DASH_FIGURE_SNAPSHOT')
+    return PrecomputedStore(snapshot, store) if snapshot and os.path.exists(snapshot) else store
+
+
+def result_key(name, version, args):
+    """Store key of callback name called with args on dataset version."""
+    return json.dumps([name, version, args], default=str)
+
+
+def memoizer(store, version):
+    """Decorator factory memoizing callbacks in store; version() names the current dataset."""
+    def memoize(fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            key = result_key(fn.__name__, version(), args)
+            value = store.get(key)
+            if value is not None:
+                metrics.increment('dash_memo_hits_total', callback=fn.__name__)
+                return value
+            metrics.increment('dash_memo_misses_total', callback=fn.__name__)
+            text = to_json_plotly(fn(*args))
+            value = json.loads(text)
+            store.put(key, value, text)
+            return value
+        return wrapper
+    return memoize
@@ -0,0 +1,183 @@
+"""Prometheus-style profiling of the Dash callbacks, served from /metrics.
+
+Every callback registered through instrument(app) records wall time per stage:
+
+    filter     row selection and dropdown options (functions wrapped in timed_stage)
+    aggregate  groupby and cube lookups (timed_stage, or a `with stage(...)` block)
+    figure     everything else the callback does, i.e. building the Plotly figure
+    serialize  from the callback returning to Dash finishing the HTTP response
+
+plus the response payload size. Counters are per process, so under gunicorn each
+scrape reports the worker that answered it. DASH_METRICS=0 turns all of it off:
+callbacks and helpers are registered unwrapped and /metrics is not mounted.
+"""
+import bisect
+import contextlib
+import functools
+import os
+import threading
+import time
+
+import flask
+
+ENABLED = os.environ.get('DASH_METRICS', '1') == '1'
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+BYTES_BUCKETS = (1 << 10, 4 << 10, 16 << 10, 64 << 10, 256 << 10, 1 << 20, 4 << 20, 16 << 20)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield ('_bucket', {'le': str(bound)}, cumulative)
+        yield ('_sum', {}, self.sum)
+        yield ('_count', {}, cumulative)
+
+
+_lock = threading.Lock()
+_local = threading.local()
+_calls = {}
+_counters = {}
+_stage_seconds = {}
+_response_bytes = {}
+
+
+def _observe(series, key, buckets, value):
+    with _lock:
+        if key not in series:
+            series[key] = Histogram(buckets)
+        series[key].observe(value)
+
+
+def increment(metric, **labels):
+    """Bump a labelled counter, e.g. increment('dash_memo_hits_total', callback='...')."""
+    if not ENABLED:
+        return
+    key = (metric, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + 1
+
+
+def _add_stage_time(name, seconds):
+    record = getattr(_local, 'record', None)
+    if record is not None:
+        record[name] = record.get(name, 0.0) + seconds
+
+
+@contextlib.contextmanager
+def _stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _add_stage_time(name, time.perf_counter() - start)
+
+
+def stage(name):
+    """Context manager attributing the enclosed block to a stage of the running callback."""
+    return _stage(name) if ENABLED else contextlib.nullcontext()
+
+
+def timed_stage(name):
+    """Decorator attributing every call of a helper to a stage of the running callback."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def profiled(fn):
+    if not ENABLED:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not flask.has_request_context():
+            return fn(*args, **kwargs)  # startup warm-up and benchmarks are not traffic
+        record = _local.record = {}
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            _local.record = None
+            record['figure'] = max(end - start - sum(record.values()), 0.0)
+            with _lock:
+                _calls[fn.__name__] = _calls.get(fn.__name__, 0) + 1
+            for name, seconds in record.items():
+                _observe(_stage_seconds, (fn.__name__, name), SECONDS_BUCKETS, seconds)
+            flask.g.dash_callback = (fn.__name__, end)
+    return wrapper
+
+
+def instrument(app):
+    """Return a drop-in replacement for app.callback that profiles each callback."""
+    if ENABLED:
+        app.server.after_request(_record_response)
+        app.server.add_url_rule('/metrics', 'metrics', _serve_metrics)
+
+    def callback(*args, **kwargs):
+        register = app.callback(*args, **kwargs)
+        return lambda fn: register(profiled(fn))
+    return callback
+
+
+def _record_response(response):
+    timing = flask.g.pop('dash_callback', None)
+    if timing is not None:
+        name, returned = timing
+        _observe(_stage_seconds, (name, 'serialize'), SECONDS_BUCKETS, time.perf_counter() - returned)
+        _observe(_response_bytes, (name,), BYTES_BUCKETS, response.calculate_content_length() or 0)
+    return response
+
+
+def _format(name, labels, value):
+    label_text = ','.join(f'{k}="{v}"' for k, v in labels.items())
+    return f'{name}{{{label_text}}} {value}'
+
+
+def render():
+    """The current metrics in Prometheus text exposition format."""
+    lines = ['# HELP dash_callback_calls_total Callback invocations.',
+             '# TYPE dash_callback_calls_total counter']
+    with _lock:
+        lines += [_format('dash_callback_calls_total', {'callback': name}, count)
+                  for name, count in sorted(_calls.items())]
+        metric = None
+        for (name, labels), count in sorted(_counters.items()):
+            if name != metric:
+                metric = name
+                lines.append(f'# TYPE {name} counter')
+            lines.append(_format(name, dict(labels), count))
+        histograms = [
+            ('dash_callback_stage_seconds', 'Wall time per callback stage.', _stage_seconds, ('callback', 'stage')),
+            ('dash_callback_response_bytes', 'Callback response payload size.', _response_bytes, ('callback',)),
+        ]
+        for metric, help_text, series, label_names in histograms:
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+            for key, histogram in sorted(series.items()):
+                labels = dict(zip(label_names, key))
+                lines += [_format(metric + suffix, {**labels, **extra}, value)
+                          for suffix, extra, value in histogram.samples()]
+    return '\n'.join(lines) + '\n'
+
+
+def _serve_metrics():
+    return flask.Response(render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,82 @@
+"""Render every reachable input combination of the memoized callbacks ahead of time.
+
+The inputs are finite: the countries, each one's cities, each city's furnishing_status,
+rooms and connectivity_score values (every dropdown may also be cleared), and the fixed
+metric dropdowns. This walks them all, renders each callback's figure in a pool of
+forked processes and writes the results to one indexed, compressed SQLite file:
+
+    python precompute.py [output] [--processes N]
+
+Point DASH_FIGURE_SNAPSHOT at the file (the default output) and the memoized callbacks
+answer from it without touching the data, for as long as the app serves the dataset
+version it was built from (see memo.py). The build reports its coverage and duration.
+"""
+import argparse
+import collections
+import inspect
+import multiprocessing
+import os
+import time
+
+from plotly.io.json import to_json_plotly
+
+import app
+import memo
+
+
+def reachable_calls():
+    """(callback name, args) for every combination of dropdown values the pages can send."""
+    calls = [('update_dashboard_chart3', (option['value'],)) for option in app.metric_dropdown_dashboard.options]
+    metrics = [option['value'] for option in app.financial_metric_dropdown_country.options]
+    for country in app.filter_options('country') + [None]:
+        for city in app.filter_options('city', ('country', country)) + [None]:
+            path = (('country', country), ('city', city))
+            calls.append(('update_country_chart1', (country, city)))
+            for furnishing in app.filter_options('furnishing_status', *path) + [None]:
+                calls.append(('update_country_chart2', (country, city, furnishing)))
+                calls += [('update_country_chart3', (country, city, furnishing, metric)) for metric in metrics]
+                calls += [('update_country_chart4', (country, city, furnishing, rooms))
+                          for rooms in app.filter_options('rooms', *path, ('furnishing_status', furnishing)) + [None]]
+            calls += [('update_country_chart5', (country, city, connectivity))
+                      for connectivity in app.filter_options('connectivity_score', *path) + [None]]
+    return calls
+
+
+def render(call):
+    """(name, key, figure JSON or None, error or None) for one call, bypassing the memo."""
+    name, args = call
+    try:
+        text = to_json_plotly(inspect.unwrap(getattr(app, name))(*args))
+    except Exception as exc:
+        return name, None, None, f'{name}{args}: {exc!r}'
+    return name, memo.result_key(name, app.current().version, args), text, None
+
+
+def build(output, processes):
+    start = time.perf_counter()
+    calls = reachable_calls()
+    # Forked workers inherit the loaded dataset and cube instead of each loading their own.
+    with multiprocessing.get_context('fork').Pool(processes) as pool:
+        rendered = list(pool.imap_unordered(render, calls, chunksize=16))
+    results = [(key, text) for _, key, text, _ in rendered if text is not None]
+    seconds = time.perf_counter() - start
+    memo.write_precomputed(output, results, {'version': app.current().version, 'figures': len(results),
+                                             'built': time.strftime('%Y-%m-%dT%H:%M:%S'), 'seconds': round(seconds, 3)})
+
+    reachable = collections.Counter(name for name, _ in calls)
+    covered = collections.Counter(name for name, _, text, _ in rendered if text is not None)
+    print(f"\n{len(results):,} of {len(calls):,} reachable inputs rendered ({len(results) / len(calls):.1%}) "
+          f"in {seconds:.1f} s on {processes} processes")
+    for name in reachable:
+        print(f"  {name:<24} {covered[name]:>6,} / {reachable[name]:<6,}")
+    for *_, error in rendered:
+        if error: print(f"  failed: {error}")
+    print(f"dataset version {app.current().version} -> {output} ({os.path.getsize(output) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', nargs='?', default=os.environ.get('DASH_FIGURE_SNAPSHOT', 'figure_snapshot.sqlite3'))
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    build(args.output, args.processes)